@@ -0,0 +1,388 @@
+# Headless timings for the tray app's hot paths, on Qt's offscreen platform
+# with stubbed audio and tgpt, in a throwaway working directory.
+#   python benchmarks/bench_ui.py --chats 200 -o bench.json
+#   python benchmarks/bench_ui.py --baseline bench.json --tolerance 0.2
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import types
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+WORDS = (
+    "python query window model voice cache latency thread socket stream prompt render "
+    "history search index budget token answer summary config provider server tray "
+    "install error timeout retry audio speech sentence deploy review database"
+).split()
+SEARCH_QUERIES = ["python", "cache latency", "sock", "provider server", "zzzz-no-match", "chat 1"]
+
+
+# No-op audio modules, installed before the app imports the real ones
+def install_stubs():
+    class _Sound:
+        def is_alive(self):
+            return False
+
+        def wait(self):
+            pass
+
+        def stop(self):
+            pass
+
+    playsound3 = types.ModuleType("playsound3")
+    playsound3.playsound = lambda sound, block=True, backend=None: _Sound()
+
+    class _Communicate:
+        def __init__(self, text, voice=None):
+            self.text = text
+
+        async def save(self, path):
+            with open(path, "wb") as f:
+                f.write(b"\0" * 64)
+
+    edge_tts = types.ModuleType("edge_tts")
+    edge_tts.Communicate = _Communicate
+
+    class _RawInputStream:
+        def __init__(self, *args, **kwargs):
+            pass
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            return False
+
+        def start(self):
+            pass
+
+        def stop(self):
+            pass
+
+        def close(self):
+            pass
+
+    sounddevice = types.ModuleType("sounddevice")
+    sounddevice.RawInputStream = _RawInputStream
+
+    class _KaldiRecognizer:
+        def __init__(self, model, sample_rate):
+            pass
+
+        def AcceptWaveform(self, data):
+            return False
+
+        def PartialResult(self):
+            return '{"partial": ""}'
+
+        def Result(self):
+            return '{"text": ""}'
+
+        def FinalResult(self):
+            return '{"text": ""}'
+
+        def Reset(self):
+            pass
+
+    vosk = types.ModuleType("vosk")
+    vosk.Model = lambda model_path=None: object()
+    vosk.KaldiRecognizer = _KaldiRecognizer
+    vosk.SetLogLevel = lambda level: None
+
+    sys.modules.update({
+        "playsound3": playsound3,
+        "edge_tts": edge_tts,
+        "sounddevice": sounddevice,
+        "vosk": vosk,
+    })
+
+    if not sys.platform.startswith("win"):
+        # settings_window reads the "run on startup" toggle from winreg
+        winreg = types.ModuleType("winreg")
+        winreg.HKEY_CURRENT_USER = winreg.KEY_ALL_ACCESS = winreg.KEY_READ = winreg.REG_SZ = 0
+
+        def _no_registry(*args, **kwargs):
+            raise OSError("no registry on this platform")
+
+        winreg.OpenKey = winreg.SetValueEx = winreg.DeleteValue = winreg.QueryValueEx = _no_registry
+        sys.modules["winreg"] = winreg
+
+
+def install_tgpt_stub(bin_dir):
+    os.makedirs(bin_dir, exist_ok=True)
+    if sys.platform.startswith("win"):
+        with open(os.path.join(bin_dir, "tgpt.bat"), "w") as f:
+            f.write("@echo off\r\necho This is a canned benchmark answer.\r\n")
+    else:
+        path = os.path.join(bin_dir, "tgpt")
+        with open(path, "w") as f:
+            f.write("#!/bin/sh\necho 'This is a canned benchmark answer.'\n")
+        os.chmod(path, 0o755)
+    os.environ["PATH"] = bin_dir + os.pathsep + os.environ.get("PATH", "")
+
+
+def synthetic_chats(count, messages_per_chat, seed=1234):
+    rng = random.Random(seed)
+    chats = []
+    for i in range(count):
+        history = []
+        for j in range(messages_per_chat):
+            sender = "You" if j % 2 == 0 else "AI"
+            length = rng.randint(4, 20) if sender == "You" else rng.randint(30, 120)
+            history.append([sender, " ".join(rng.choice(WORDS) for _ in range(length)).capitalize() + "."])
+        chats.append({"id": f"bench-{i}", "name": f"Chat {i + 1}", "model": "phind", "history": history})
+    return chats
+
+
+def summarize(samples_ms):
+    ordered = sorted(samples_ms)
+    return {
+        "runs": len(ordered),
+        "mean_ms": round(statistics.fmean(ordered), 3),
+        "median_ms": round(statistics.median(ordered), 3),
+        "p95_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 3),
+        "min_ms": round(ordered[0], 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return (time.perf_counter() - start) * 1000
+
+
+def run_benchmarks(args):
+    results = {}
+
+    start = time.perf_counter()
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QEventLoop, QTimer
+    app = QApplication.instance() or QApplication([])
+    app.setQuitOnLastWindowClosed(False)
+
+    import tray
+    import config.chat_search_index as chat_search_index
+    from config.chat_history_manager import save_chat_history
+    from config.config_store import get_config_store
+    from widgets.typing_text_view import TypingTextView
+    results["import_app"] = summarize([(time.perf_counter() - start) * 1000])
+
+    def settle():
+        app.processEvents()
+        app.processEvents()
+
+    def reset_search_index():
+        chat_search_index._index = None
+
+    save_chat_history(synthetic_chats(args.chats, args.messages))
+
+    # --- TrayApp.__init__ (icon only) and the deferred startup stages ---
+    init_samples = []
+    deferred_samples = []
+    built = []
+    for _ in range(args.repeat):
+        reset_search_index()
+        if built:
+            built[-1].chat_manager.deleteLater()
+            settle()
+        init_samples.append(timed(lambda: built.append(tray.TrayApp("assets/logo-colour.svg"))))
+        deferred_samples.append(timed(built[-1].finish_startup))
+    results["tray_init"] = summarize(init_samples)
+    results[f"tray_deferred_startup_{args.chats}_chats"] = summarize(deferred_samples)
+    tray_app = built[-1]
+    settle()
+
+    # --- load_saved_chats on its own ---
+    samples = []
+    for _ in range(args.repeat):
+        tray_app.chat_sessions.clear()
+        reset_search_index()
+        samples.append(timed(tray_app.load_saved_chats))
+    results[f"load_saved_chats_{args.chats}_chats"] = summarize(samples)
+    settle()
+
+    # --- ChatWindow.add_message ---
+    tray_app.open_new_chat_window()
+    window = tray_app.chat_sessions[-1].window
+    window.show()
+    settle()
+    rng = random.Random(99)
+    samples = []
+    for i in range(args.add_messages):
+        sender = "You" if i % 2 == 0 else "AI"
+        text = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 80)))
+        samples.append(timed(lambda: (window.add_message(sender, text, selectable=True), settle())))
+    results["chat_window_add_message"] = summarize(samples)
+
+    # --- get_ai_response end to end: tgpt stub -> stream or typing -> rendered ---
+    def wait_until(done, timeout_ms=30000):
+        loop = QEventLoop()
+        poll = QTimer()
+        poll.setInterval(1)
+        poll.timeout.connect(lambda: done() and loop.quit())
+        QTimer.singleShot(timeout_ms, loop.quit)  # safety net
+        poll.start()
+        loop.exec_()
+        poll.stop()
+
+    def answered():
+        return window.active_request is None and window.render_trace is None
+
+    store = get_config_store()
+    for name, stream in (("llm_request_streamed", True), ("llm_request_typed", False)):
+        store.update({"stream_responses": stream, "text_speed": args.ms_per_char})
+        samples = []
+        for i in range(args.repeat):
+            window.add_message("You", f"benchmark question {i}", selectable=True)
+            start = time.perf_counter()
+            window.get_ai_response(f"benchmark question {i}")
+            wait_until(answered)
+            samples.append((time.perf_counter() - start) * 1000)
+        results[name] = summarize(samples)
+
+    # --- ChatManagerWindow.refresh with search queries ---
+    manager = tray_app.chat_manager
+    manager.show()
+    settle()
+    # The first query pays for indexing the loaded chats
+    results["chat_manager_first_search"] = summarize(
+        [timed(lambda: (manager.search_box.setText(SEARCH_QUERIES[0]), settle()))]
+    )
+    samples = []
+    for _ in range(args.repeat):
+        for query in SEARCH_QUERIES:
+            manager.search_box.blockSignals(True)
+            manager.search_box.setText(query)
+            manager.search_box.blockSignals(False)
+            samples.append(timed(lambda: (manager.refresh(), settle())))
+    results["chat_manager_search_refresh"] = summarize(samples)
+    manager.search_box.setText("")
+    results["chat_manager_full_refresh"] = summarize(
+        [timed(lambda: (manager.refresh(), settle())) for _ in range(args.repeat)]
+    )
+
+    # --- Typing animation to completion ---
+    view = TypingTextView(prefix="AI:")
+    view.resize(380, 100)
+    view.show()
+    text = " ".join(random.Random(7).choice(WORDS) for _ in range(args.typing_words))
+    samples = []
+    for _ in range(args.repeat):
+        loop = QEventLoop()
+        view.typing_finished.connect(loop.quit)
+        QTimer.singleShot(60000, loop.quit)  # safety net
+        start = time.perf_counter()
+        view.type_text(text, args.ms_per_char)
+        loop.exec_()
+        samples.append((time.perf_counter() - start) * 1000)
+        view.typing_finished.disconnect(loop.quit)
+    results["typing_animation"] = summarize(samples)
+    results["typing_animation"]["chars"] = len(text)
+    results["typing_animation"]["nominal_ms"] = len(text) * args.ms_per_char
+
+    # --- save_all_chats (one new message per chat, then flush to disk) ---
+    samples = []
+    for round_ in range(args.repeat):
+        for session in tray_app.chat_sessions:
+            session.message_history.append(("You", f"benchmark round {round_}"))
+
+        def save():
+            tray_app.save_all_chats()
+            tray_app.persistence_writer.flush(timeout=60)
+
+        samples.append(timed(save))
+    results[f"save_all_chats_{args.chats}_chats"] = summarize(samples)
+
+    tray_app.flush_chats()
+    return results
+
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    print(f"{'benchmark':<40} {'baseline':>12} {'current':>12} {'change':>9}", file=sys.stderr)
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            print(f"{name:<40} {'-':>12} {current['median_ms']:>10.2f}ms {'new':>9}", file=sys.stderr)
+            continue
+        before, after = previous["median_ms"], current["median_ms"]
+        change = (after - before) / before if before else 0.0
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  <-- slower"
+        print(f"{name:<40} {before:>10.2f}ms {after:>10.2f}ms {change:>+8.1%}{flag}", file=sys.stderr)
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the tray app's UI hot paths headlessly.")
+    parser.add_argument("--chats", type=int, default=200, help="synthetic saved chats to load")
+    parser.add_argument("--messages", type=int, default=40, help="messages per synthetic chat")
+    parser.add_argument("--add-messages", type=int, default=150, help="add_message calls to time")
+    parser.add_argument("--typing-words", type=int, default=120, help="words in the typing animation")
+    parser.add_argument("--ms-per-char", type=int, default=2, help="typing speed for the animation")
+    parser.add_argument("--repeat", type=int, default=3, help="repetitions of each scenario")
+    parser.add_argument("-o", "--output", help="write the JSON report here (default: stdout)")
+    parser.add_argument("--baseline", help="JSON report to compare against; exits 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="allowed slowdown of the median before failing (0.2 = 20%%)")
+    args = parser.parse_args(argv)
+
+    os.environ["QT_QPA_PLATFORM"] = "offscreen"
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r") as f:
+            baseline = json.load(f)["results"]
+    output = os.path.abspath(args.output) if args.output else None
+
+    workdir = tempfile.mkdtemp(prefix="lucid-bench-")
+    cwd = os.getcwd()
+    try:
+        shutil.copytree(os.path.join(REPO_ROOT, "assets"), os.path.join(workdir, "assets"))
+        os.chdir(workdir)
+        sys.path.insert(0, REPO_ROOT)
+        install_stubs()
+        install_tgpt_stub(os.path.join(workdir, "bin"))
+
+        # App logging would otherwise interleave with the report
+        real_stdout, sys.stdout = sys.stdout, sys.stderr
+        try:
+            results = run_benchmarks(args)
+        finally:
+            sys.stdout = real_stdout
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": {k: v for k, v in vars(args).items() if k not in ("output", "baseline")},
+        },
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+
+    if baseline is not None and compare(results, baseline, args.tolerance):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
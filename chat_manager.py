@@ -1,16 +1,20 @@
 from PyQt5.QtWidgets import (
-    QWidget, QListWidget, QVBoxLayout, QLabel, QHBoxLayout,
-    QPushButton, QListWidgetItem, QInputDialog, QMenu, QAction,
-    QLineEdit
+    QWidget, QListView, QVBoxLayout, QLabel, QHBoxLayout,
+    QPushButton, QInputDialog, QMenu, QAction, QLineEdit
 )
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QIcon, QPixmap
+from config.chat_search_index import get_search_index
+from widgets.chat_list_model import ChatListModel, ChatListDelegate
 
 
 class ChatManagerWindow(QWidget):
     def __init__(self, tray_ref):
         super().__init__()
         self.tray_ref = tray_ref
+        self._dirty_chat_ids = set()
+        self._needs_reset = False
+        self._flush_scheduled = False
 
         self.setWindowTitle("Lucid Chat Manager")
         self.setFixedSize(600, 500)
@@ -24,16 +28,13 @@ class ChatManagerWindow(QWidget):
                 color: #aaccff;
                 font-family: 'Segoe UI', sans-serif;
             }
-            QListWidget {
+            QListView {
                 background-color: #001626;
                 border: none;
                 padding: 8px;
                 font-size: 11pt;
                 color: #aaccff;
             }
-            QListWidget::item:selected {
-                background-color: #334455;
-            }
             QPushButton {
                 background-color: #223344;
                 color: #aaccff;
@@ -101,53 +102,87 @@ class ChatManagerWindow(QWidget):
         layout.addLayout(header)
 
         # --- Chat List ---
-        self.chat_list = QListWidget()
-        self.chat_list.itemClicked.connect(self.focus_chat)
+        # Rows are painted by the delegate, so only visible chats cost anything
+        self.chat_model = ChatListModel(self.get_last_user_message, self)
+        self.chat_list = QListView()
+        self.chat_list.setModel(self.chat_model)
+        self.chat_list.setItemDelegate(ChatListDelegate(self.chat_list))
+        self.chat_list.setUniformItemSizes(True)
+        self.chat_list.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.chat_list.clicked.connect(self.focus_chat)
         self.chat_list.setContextMenuPolicy(Qt.CustomContextMenu)
         self.chat_list.customContextMenuRequested.connect(self.show_context_menu)
         layout.addWidget(self.chat_list)
         self.refresh()
 
     def refresh(self):
-        self.chat_list.clear()
+        self._dirty_chat_ids.clear()
+        self._needs_reset = False
         query = self.search_box.text().strip().lower() if hasattr(self, "search_box") else ""
 
-        for i, chat in enumerate(self.tray_ref.chat_windows):
-            title = getattr(chat, "custom_name", f"Chat {i + 1}")
-            model = chat.config.get("selected_model", "Unknown")
-            title_with_model = f"{title} ({model})"
-
-            preview = self.get_last_user_message(chat)
-
-            # Combine title and preview for filtering
-            search_text = f"{title_with_model} {preview}".lower()
-            if query and query not in search_text:
-                continue  # Skip chats that don't match the search
-
-            widget = QWidget()
-            vbox = QVBoxLayout(widget)
-            vbox.setContentsMargins(10, 10, 10, 10)
-
-            title_label = QLabel(title_with_model)
-            title_label.setStyleSheet("font-weight: bold;")
-            vbox.addWidget(title_label)
-
-            preview_label = QLabel(preview)
-            preview_label.setWordWrap(True)
-            preview_label.setStyleSheet("color: #6688cc; font-size: 10pt;")
-            vbox.addWidget(preview_label)
-
-            item = QListWidgetItem()
-            item.setSizeHint(widget.sizeHint())
-            self.chat_list.addItem(item)
-            self.chat_list.setItemWidget(item, widget)
-
-
-
-    def focus_chat(self, item):
-        index = self.chat_list.row(item)
-        if 0 <= index < len(self.tray_ref.chat_windows):
-            chat = self.tray_ref.chat_windows[index]
+        if query:
+            # Ranked hits from every message, with the matching snippet as preview
+            sessions_by_id = {chat.chat_id: chat for chat in self.tray_ref.chat_sessions}
+            rows = [
+                (sessions_by_id[hit.chat_id], hit.snippet)
+                for hit in get_search_index().search(query)
+                if hit.chat_id in sessions_by_id
+            ]
+        else:
+            rows = [(chat, None) for chat in self.tray_ref.chat_sessions]
+
+        self.chat_model.set_rows(rows)
+
+    def is_filtered(self):
+        return bool(self.search_box.text().strip())
+
+    # --- Invalidation ---
+    # Changes are only recorded while the manager is hidden and applied once
+    # per event-loop turn while it is visible.
+    def invalidate(self, session=None):
+        if session is None:
+            self._needs_reset = True
+        else:
+            self._dirty_chat_ids.add(session.chat_id)
+        if self.isVisible() and not self._flush_scheduled:
+            self._flush_scheduled = True
+            QTimer.singleShot(0, self.flush_updates)
+
+    def flush_updates(self):
+        self._flush_scheduled = False
+        if not self.isVisible():
+            return
+        if self._needs_reset or (self._dirty_chat_ids and self.is_filtered()):
+            self.refresh()
+            return
+        for chat_id in self._dirty_chat_ids:
+            self.chat_model.chat_changed(chat_id)
+        self._dirty_chat_ids.clear()
+
+    def chat_added(self, session):
+        if self.isVisible() and not self.is_filtered():
+            self.chat_model.append_session(session)
+        else:
+            self.invalidate()
+
+    def chat_changed(self, session):
+        self.invalidate(session)
+
+    def chat_removed(self, session):
+        self._dirty_chat_ids.discard(session.chat_id)
+        if self.isVisible():
+            self.chat_model.remove_session(session.chat_id)
+        else:
+            self.invalidate()
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.flush_updates()
+
+    def focus_chat(self, index):
+        session = self.chat_model.session_at(index)
+        if session is not None:
+            chat = self.tray_ref.get_chat_window(session)
 
             if not chat.isVisible():
                 # Position chat to the right of the manager
@@ -165,56 +200,49 @@ class ChatManagerWindow(QWidget):
 
 
     def get_last_user_message(self, chat):
-        user_messages = [msg for sender, msg in getattr(chat, "message_history", []) if sender == "You"]
-        if not user_messages:
-            return "(No messages yet)"
-        
-        last_msg = user_messages[-1].strip().replace('\n', ' ')
-        lines = last_msg.split('. ')
-        preview = ". ".join(lines[:2])
-        return preview[:100] + ("…" if len(preview) > 100 else "")
+        return chat.preview
 
     def show_context_menu(self, position):
-        item = self.chat_list.itemAt(position)
-        if not item:
+        index = self.chat_list.indexAt(position)
+        session = self.chat_model.session_at(index)
+        if session is None:
             return
 
-        index = self.chat_list.row(item)
-        if not (0 <= index < len(self.tray_ref.chat_windows)):
-            return
-
-        chat = self.tray_ref.chat_windows[index]
-
         menu = QMenu()
 
         open_action = QAction("Open Chat", self)
-        open_action.triggered.connect(lambda: self.focus_chat(item))
+        open_action.triggered.connect(lambda: self.focus_chat(index))
         menu.addAction(open_action)
 
         rename_action = QAction("Rename Chat", self)
-        rename_action.triggered.connect(lambda: self.rename_chat(index))
+        rename_action.triggered.connect(lambda: self.rename_chat(session))
         menu.addAction(rename_action)
 
         delete_action = QAction("Delete Chat", self)
-        delete_action.triggered.connect(lambda: self.delete_chat(index))
+        delete_action.triggered.connect(lambda: self.delete_chat(session))
         menu.addAction(delete_action)
 
         menu.exec_(self.chat_list.viewport().mapToGlobal(position))
 
-    def rename_chat(self, index):
-        chat = self.tray_ref.chat_windows[index]
-        current_name = getattr(chat, "custom_name", f"Chat {index + 1}")
+    def rename_chat(self, chat):
+        current_name = chat.custom_name or "Chat"
         new_name, ok = QInputDialog.getText(self, "Rename Chat", "Enter a new name:", text=current_name)
         if ok and new_name.strip():
             chat.custom_name = new_name.strip()
-            self.refresh()
-
-    def delete_chat(self, index):
-        chat = self.tray_ref.chat_windows[index]
-        chat.hide()
-        chat.deleteLater()  # schedules it for deletion
-        del self.tray_ref.chat_windows[index]  # remove it manually
-        self.refresh()  # update the chat list
+            get_search_index().set_title(chat)
+            chat.mark_dirty()
+            self.chat_changed(chat)
+
+    def delete_chat(self, session):
+        if session.window is not None:
+            session.window.dispose()
+            session.window.hide()
+            session.window.deleteLater()  # schedules it for deletion
+            session.window = None
+        self.tray_ref.chat_sessions.remove(session)  # remove it manually
+        get_search_index().remove_chat(session.chat_id)
+        self.tray_ref.persistence_writer.mark_deleted(session.chat_id)
+        self.chat_removed(session)  # update the chat list
 
     def mousePressEvent(self, event):
         if event.button() == Qt.LeftButton:
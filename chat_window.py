@@ -4,12 +4,18 @@ import shlex
 import asyncio
 import threading
 import os
-import queue
-import json
-from vosk import Model, KaldiRecognizer
-import sounddevice as sd
-from config.config_manager import load_config, save_config
-from config.model_utils import get_provider_from_model
+import time
+from config.config_store import get_config_store
+from config.model_utils import get_provider_from_model, get_available_models
+from config.ollama_catalog import get_ollama_catalog
+from config.chat_session import ChatSession
+from config.chat_search_index import get_search_index
+from config.request_engine import LLMRequest, ProviderRequest, get_request_engine
+from config.provider_client import get_backend, resolve_endpoint
+from config.response_cache import make_cache_key
+from config.context_builder import MAX_COMMAND_PROMPT_CHARS
+from config.metrics import get_metrics
+from config.vosk_model_registry import VOSK_MODEL_PATH
 
 
 if sys.platform.startswith("win") and isinstance(asyncio.get_event_loop(), asyncio.ProactorEventLoop):
@@ -19,20 +25,25 @@ from PyQt5.QtWidgets import (
     QWidget, QVBoxLayout, QHBoxLayout, QTextEdit, QPushButton, QLabel,
     QScrollArea, QToolButton, QApplication, QFrame, QComboBox
 )
-from PyQt5.QtCore import Qt, QTimerEvent, QTimer, QPoint
+from PyQt5.QtCore import Qt, QTimer, QPoint
 from PyQt5.QtGui import QPixmap, QIcon, QClipboard
-from edge_tts import Communicate
-from playsound3 import playsound
 from widgets.enter_send_textedit import EnterSendTextEdit
-import uuid
+from widgets.typing_text_view import TypingTextView
+
+PAGE_SIZE = 20               # messages rendered per "load older" page
+MAX_RENDERED_MESSAGES = 60   # bubbles kept alive while paging through history
 
 
 class ChatWindow(QWidget):
-    def __init__(self, icon_path, config, tray_ref=None):
+    def __init__(self, icon_path, config, tray_ref=None, session=None):
         super().__init__()
-        self.chat_id = str(uuid.uuid4())
-        self.custom_name = f"Chat {len(tray_ref.chat_windows) + 1}" if tray_ref else "Chat"
-        self.message_history = []
+        if session is None:
+            session = ChatSession(
+                name=f"Chat {len(tray_ref.chat_sessions) + 1}" if tray_ref else "Chat",
+                model=config.get("selected_model", "phind")
+            )
+        self.session = session
+        session.window = self
 
         self.setWindowTitle("Lucid")
         self.tray_ref = tray_ref
@@ -41,13 +52,13 @@ class ChatWindow(QWidget):
         self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint)
         self.setAttribute(Qt.WA_TranslucentBackground)  # Enables transparency
         self.setFocusPolicy(Qt.StrongFocus)
-        self.model = Model(model_path="config/models/vosk-model-small-en-us-0.15")
         self.setObjectName("ChatWindow")
         self.setProperty("docked", True)
         self.drag_pos = None
         self.is_maximized = False
-        self.config = load_config()
-        self.model_name = self.config.get("selected_model", "phind")
+        # The process-wide config; changes arrive through on_config_value_changed
+        self.config_store = get_config_store()
+        self.config = self.config_store.config
         self.typing_speed = self.config.get("text_speed", 20)
         self.tts_voice = self.config.get("tts_voice", "en-GB-RyanNeural")
 
@@ -84,22 +95,11 @@ class ChatWindow(QWidget):
             }
         """)
 
-        # Populate from enabled models
-        available_models = [
-            "gpt-3.5-turbo", "gpt-4o", "gemini-pro", "deepseek-chat",
-            "mixtral", "llama3", "phind", "isou", "pollinations"
-        ]
-        enabled_models = self.config.get("enabled_models", {})
-        for model in available_models:
-            provider = get_provider_from_model(model)
-            if enabled_models.get(provider, False):
-                self.model_dropdown.addItem(model)
-
-        # Set current model
-        current_model = self.config.get("selected_model", "phind")
-        index = self.model_dropdown.findText(current_model)
-        if index != -1:
-            self.model_dropdown.setCurrentIndex(index)
+        # Populate from enabled models, including any local Ollama models
+        # the catalog has found so far; it refreshes in the background
+        self.populate_model_dropdown(self.model_name)
+        get_ollama_catalog().models_changed.connect(self.on_ollama_models_changed)
+        self.config_store.value_changed.connect(self.on_config_value_changed)
 
         # Update config on change
         self.model_dropdown.currentIndexChanged.connect(self.update_model_selection)
@@ -111,7 +111,7 @@ class ChatWindow(QWidget):
         self.voice_recognition_button.setIcon(QIcon(mic_icon_path))
         self.voice_recognition_button.setToolTip("Voice Recognition")
         self.voice_recognition_button.setFixedSize(30, 30)
-        self.voice_recognition_button.clicked.connect(self.start_voice_recognition)
+        self.voice_recognition_button.clicked.connect(lambda: self.start_voice_recognition())
         collapse_row.addWidget(self.voice_recognition_button)
 
         self.dock_button = QPushButton("🗗")
@@ -135,9 +135,28 @@ class ChatWindow(QWidget):
         self.chat_content = QVBoxLayout()
         self.chat_content.setAlignment(Qt.AlignTop)
 
+        # Only a window of the history is rendered as bubbles; these sit
+        # above and below it to page through the rest
+        self.load_older_button = QPushButton("Load older messages")
+        self.load_older_button.clicked.connect(self.load_older_messages)
+        self.load_older_button.hide()
+        self.chat_content.addWidget(self.load_older_button)
+
+        self.jump_latest_button = QPushButton("Jump to latest ▼")
+        self.jump_latest_button.clicked.connect(self.show_latest_messages)
+        self.jump_latest_button.hide()
+        self.chat_content.addWidget(self.jump_latest_button)
+
+        self.message_bubbles = []  # bubbles for message_history[rendered_start:rendered_end]
+        self.rendered_start = 0
+        self.rendered_end = 0
+        self._scroll_restore = None
+
         container = QWidget()
         container.setLayout(self.chat_content)
         self.chat_area.setWidget(container)
+        self.chat_area.verticalScrollBar().valueChanged.connect(self.on_chat_scrolled)
+        self.chat_area.verticalScrollBar().rangeChanged.connect(self.on_chat_range_changed)
         outer_layout.addWidget(self.chat_area)
 
         # --- Input + Send ---
@@ -147,13 +166,17 @@ class ChatWindow(QWidget):
         outer_layout.addWidget(self.input_box)
 
         self.send_button = QPushButton("Send")
-        self.send_button.clicked.connect(self.send_prompt)
+        self.send_button.clicked.connect(self.on_send_clicked)
         outer_layout.addWidget(self.send_button)
 
-        self.typing_timer = None
-        self.typing_label = None
-        self.typing_text = ""
-        self.typing_index = 0
+        self.active_request = None
+        self.active_trace = None
+        self.render_trace = None   # (trace, status) waiting for the typing animation
+        self.stream_bubble = None
+        self.stream_text = ""
+        self.voice_worker = None
+        self.voice_trace = None
+        self.voice_bubble = None
 
         # --- Stylesheet ---
         self.setStyleSheet("""
@@ -194,9 +217,109 @@ class ChatWindow(QWidget):
             }
         """)
 
+        self.show_latest_messages()
+
            # --- Popout / Restore ---
 
 
+    # --- Session-backed state ---
+    @property
+    def chat_id(self):
+        return self.session.chat_id
+
+    @property
+    def custom_name(self):
+        return self.session.custom_name
+
+    @custom_name.setter
+    def custom_name(self, value):
+        self.session.custom_name = value
+
+    @property
+    def model_name(self):
+        return self.session.model_name
+
+    @model_name.setter
+    def model_name(self, value):
+        self.session.model_name = value
+
+    @property
+    def message_history(self):
+        return self.session.message_history
+
+    # --- Message paging ---
+    def show_latest_messages(self):
+        self.setUpdatesEnabled(False)  # Prevent UI redraw while loading
+        try:
+            for bubble in self.message_bubbles:
+                self.discard_bubble(bubble)
+            self.message_bubbles = []
+            self._scroll_restore = None
+            self.rendered_end = len(self.message_history)
+            self.rendered_start = max(self.rendered_end - PAGE_SIZE, 0)
+            for sender, message in self.message_history[self.rendered_start:self.rendered_end]:
+                self.message_bubbles.append(self.create_message_bubble(sender, message, selectable=True))
+        finally:
+            self.setUpdatesEnabled(True)
+        self.update_paging_buttons()
+        QTimer.singleShot(0, self.scroll_to_bottom)
+
+    def load_older_messages(self):
+        count = min(PAGE_SIZE, self.rendered_start)
+        if count == 0:
+            return
+
+        scroll_bar = self.chat_area.verticalScrollBar()
+        # Keep the message under the cursor in place once the page lands
+        self._scroll_restore = (scroll_bar.maximum(), scroll_bar.value())
+
+        new_start = self.rendered_start - count
+        self.setUpdatesEnabled(False)
+        try:
+            older = []
+            for offset, (sender, message) in enumerate(self.message_history[new_start:self.rendered_start]):
+                older.append(self.create_message_bubble(sender, message, selectable=True, position=1 + offset))
+            self.message_bubbles[0:0] = older
+            self.rendered_start = new_start
+
+            # Drop the newest bubbles to keep memory bounded, unless an answer
+            # is still streaming in below them
+            while len(self.message_bubbles) > MAX_RENDERED_MESSAGES and self.stream_bubble is None:
+                self.discard_bubble(self.message_bubbles.pop())
+                self.rendered_end -= 1
+        finally:
+            self.setUpdatesEnabled(True)
+        self.update_paging_buttons()
+
+    def trim_oldest_messages(self):
+        while len(self.message_bubbles) > MAX_RENDERED_MESSAGES:
+            self.discard_bubble(self.message_bubbles.pop(0))
+            self.rendered_start += 1
+        self.update_paging_buttons()
+
+    def discard_bubble(self, bubble):
+        self.chat_content.removeWidget(bubble)
+        bubble.deleteLater()
+
+    def update_paging_buttons(self):
+        self.load_older_button.setVisible(self.rendered_start > 0)
+        self.jump_latest_button.setVisible(self.rendered_end < len(self.message_history))
+
+    def on_chat_scrolled(self, value):
+        if value == self.chat_area.verticalScrollBar().minimum() and self.rendered_start > 0 \
+                and self._scroll_restore is None:
+            self.load_older_messages()
+
+    def on_chat_range_changed(self, minimum, maximum):
+        if self._scroll_restore is not None:
+            old_maximum, old_value = self._scroll_restore
+            self._scroll_restore = None
+            self.chat_area.verticalScrollBar().setValue(old_value + maximum - old_maximum)
+
+    def scroll_to_bottom(self):
+        scroll_bar = self.chat_area.verticalScrollBar()
+        scroll_bar.setValue(scroll_bar.maximum())
+
     def toggle_popout(self):
         if self.docked:
             self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint)
@@ -229,7 +352,6 @@ class ChatWindow(QWidget):
             self.docked = True
             self.setProperty("docked", True)
 
-        self.tray_ref.save_all_chats()
         self.show()  # Must call show() again after changing flags
 
     # --- Drag to Move ---
@@ -243,42 +365,86 @@ class ChatWindow(QWidget):
             self.move(event.globalPos() - self.drag_pos)
             event.accept()
 
-    def apply_config(self, config):
-        self.config = config
-        self.typing_speed = config.get("text_speed", 20)
-        self.tts_voice = config.get("tts_voice", "en-GB-RyanNeural")
-    
-    def update_model_selection(self):
-        selected_model = self.model_dropdown.currentText()
-        self.config["selected_model"] = selected_model
-        save_config(self.config)
-
+    def on_config_value_changed(self, key, value):
+        if key == "text_speed":
+            self.typing_speed = value
+        elif key == "tts_voice":
+            self.tts_voice = value
+        elif key == "enabled_models":
+            self.populate_model_dropdown()
+
+    def populate_model_dropdown(self, current_model=None):
+        if current_model is None:
+            current_model = self.model_dropdown.currentText()
+        self.model_dropdown.blockSignals(True)
+        self.model_dropdown.clear()
+        self.model_dropdown.addItems(get_available_models(self.config, get_ollama_catalog().models))
+        index = self.model_dropdown.findText(current_model)
+        if index != -1:
+            self.model_dropdown.setCurrentIndex(index)
+        self.model_dropdown.blockSignals(False)
 
+    def on_ollama_models_changed(self, models):
+        self.populate_model_dropdown()
 
-    def add_message(self, sender, message, selectable=False):
+    def update_model_selection(self):
+        selected_model = self.model_dropdown.currentText()
+        self.model_name = selected_model
+        get_search_index().set_title(self.session)
+        self.session.mark_dirty()
+        # Remembered as the default for the next new chat; other open chats
+        # keep their own model
+        self.config_store.set("selected_model", selected_model)
+
+
+
+    def add_message(self, sender, message, selectable=False, animate=False):
+        if self.rendered_end < len(self.message_history):
+            self.show_latest_messages()  # paged back; return to the live end first
+        self.session.append_message(sender, message)
+        bubble_widget = self.create_message_bubble(sender, "" if animate else message, selectable)
+        self.adopt_bubble(bubble_widget)
+        if animate:
+            bubble_widget.message_text = message
+            bubble_widget.message_label.type_text(message, self.typing_speed)
+        self.tray_ref.chat_manager.chat_changed(self.session)
+
+    def adopt_bubble(self, bubble_widget):
+        # Track a bubble for the message just appended to the history
+        self.message_bubbles.append(bubble_widget)
+        self.rendered_end = len(self.message_history)
+        self.trim_oldest_messages()
+
+    def create_message_bubble(self, sender, message, selectable=False, position=None):
         bubble_widget = QWidget()
+        bubble_widget.message_text = message
         bubble_layout = QVBoxLayout(bubble_widget)
         bubble_layout.setContentsMargins(8, 6, 8, 6)
         bubble_layout.setSpacing(4)
 
-        message_label = QLabel(f"<b>{sender}:</b> {message}")
-        message_label.setWordWrap(True)
+        if sender == "AI":
+            # Typed and streamed answers grow in place without re-laying out
+            # the whole text
+            message_label = TypingTextView(f"{sender}:")
+            message_label.set_text(message)
+        else:
+            message_label = QLabel(f"<b>{sender}:</b> {message}")
+            message_label.setWordWrap(True)
         message_label.setTextInteractionFlags(Qt.TextSelectableByMouse if selectable else Qt.NoTextInteraction)
 
         message_color = "#001e33" if sender == "AI" else "#002b4d"
         message_label.setStyleSheet(f"""
             background-color: {message_color};
             color: #6688cc;
+            border: none;
             border-radius: 6px;
             padding: 6px;
         """)
 
         bubble_layout.addWidget(message_label)
+        bubble_widget.message_label = message_label
 
-        # Store reference if typing effect is needed
         if sender == "AI":
-            self.typing_label = message_label
-
             controls = QWidget()
             controls_layout = QHBoxLayout(controls)
             controls_layout.setContentsMargins(0, 0, 0, 0)
@@ -288,7 +454,7 @@ class ChatWindow(QWidget):
             # Speaker icon
             speaker_button = QPushButton()
             speaker_button.setCursor(Qt.PointingHandCursor)
-            speaker_button.setToolTip("Read aloud")
+            speaker_button.setToolTip("Read aloud (click again to stop)")
             icon_path = os.path.join("assets", "speaker_icon.png")
             if os.path.exists(icon_path):
                 speaker_button.setIcon(QIcon(icon_path))
@@ -298,7 +464,7 @@ class ChatWindow(QWidget):
             speaker_button.setFixedSize(24, 24)
             speaker_button.setStyleSheet("QPushButton { background-color: transparent; border: none; }"
                                          "QPushButton:hover { background-color: #334455; border-radius: 4px; }")
-            speaker_button.clicked.connect(lambda: self.speak_text(message))
+            speaker_button.clicked.connect(lambda: self.speak_text(bubble_widget.message_text))
             controls_layout.addWidget(speaker_button)
 
             # Copy button
@@ -322,191 +488,302 @@ class ChatWindow(QWidget):
                 }
             """)
             copy_button.setCursor(Qt.PointingHandCursor)
-            copy_button.clicked.connect(lambda: QApplication.clipboard().setText(message))
+            copy_button.clicked.connect(lambda: QApplication.clipboard().setText(bubble_widget.message_text))
             controls_layout.addWidget(copy_button)
 
             bubble_layout.addWidget(controls)
 
-        self.chat_content.addWidget(bubble_widget)
-        if sender != "You":
-            self.message_history.append((sender, message))
-        self.tray_ref.chat_manager.refresh()
+        if position is None:
+            position = self.chat_content.count() - 1  # above the "jump to latest" button
+        self.chat_content.insertWidget(position, bubble_widget)
+        return bubble_widget
 
 
+    def on_send_clicked(self):
+        if self.active_request is not None:
+            self.cancel_ai_response()
+        else:
+            self.send_prompt()
+
     def send_prompt(self):
+        if self.active_request is not None:
+            return  # Wait for the current answer (or press Stop)
         prompt = self.input_box.toPlainText().strip()
         if not prompt:
             return
         self.add_message("You", prompt, selectable=True)
         self.input_box.clear()
         self.get_ai_response(prompt)
-        if self.tray_ref:
-            self.tray_ref.save_all_chats()
 
     def get_ai_response(self, prompt):
         try:
-            selected_model = self.config.get("selected_model", "phind")
+            # This chat's own model; the shared selected_model is only the
+            # default for new chats
+            selected_model = self.model_name
             enabled_models = self.config.get("enabled_models", {})
-            model_provider_map = {
-                "gpt-3.5-turbo": "openai",
-                "gpt-4o": "openai",
-                "gemini-pro": "gemini",
-                "deepseek-chat": "deepseek",
-                "mixtral": "groq",
-                "llama3": "groq",
-                "phind": "phind",
-                "isou": "isou",
-                "pollinations": "pollinations"
-            }
             provider = get_provider_from_model(selected_model)
             api_key = self.config.get("api_keys", {}).get(provider, "")
+            stream = self.config.get("stream_responses", True)
+
+            if get_backend(provider, self.config) == "http":
+                # Recent turns within the model's token budget, older ones summarized
+                messages = self.session.context.build_messages(self.message_history, selected_model)
+                endpoint = resolve_endpoint(provider, self.config)
+                request = ProviderRequest(endpoint, selected_model, messages,
+                                          api_key=api_key, timeout=30, stream=stream)
+                context = messages
+            else:
+                cmd = f"tgpt -q --provider {provider}"
 
+                if api_key and api_key != "enabled":
+                    cmd += f" --key {api_key} --model {selected_model}"
+                    if provider == "openai":
+                        openai_url = self.config.get("openai_api_base", "https://api.openai.com/v1")
+                        cmd += f" --url {openai_url}"
 
-            cmd = f"tgpt -q --provider {provider}"
-
-            if api_key and api_key != "enabled":
-                cmd += f" --key {api_key} --model {selected_model}"
-                if provider == "openai":
-                    openai_url = self.config.get("openai_api_base", "https://api.openai.com/v1")
-                    cmd += f" --url {openai_url}"
-
-            # Append the original user message (preserve line breaks)
-            self.message_history.append(("You", prompt))
-
-            # Sanitize for tgpt prompt
-            sanitized_history = []
-            for sender, msg in self.message_history:
-                cleaned = msg.replace("\n", " | ").replace("\r", " ").strip()
-                sanitized_history.append(f"{sender}: {cleaned}")
-
-            # Use double-pipe to separate message blocks
-            full_prompt = " || ".join(sanitized_history)
-
-            cmd += f' "{full_prompt.strip()}"'
-            print("[DEBUG] Running command:", cmd)
+                full_prompt = self.session.context.format_prompt(
+                    self.message_history, selected_model, max_chars=MAX_COMMAND_PROMPT_CHARS
+                )
 
+                cmd += f' "{full_prompt.strip()}"'
+                print("[DEBUG] Running command:", cmd)
 
-            result = subprocess.run(
-                cmd,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=30
-            )
+                request = LLMRequest(cmd, timeout=30, stream=stream)
+                context = full_prompt
 
-            response = result.stdout.strip() if result.returncode == 0 else f"[Error]: {result.stderr}"
+            cache_key = None
+            if self.config.get("cache_responses", False):
+                cache_key = make_cache_key(provider, selected_model, context)
         except Exception as e:
-            response = f"[Exception]: {e}"
-
-        self.typing_text = response
-        self.typing_index = 0
-
+            self.show_ai_response(f"[Exception]: {e}")
+            return
 
-        self.add_message("AI", response, selectable=True)
+        self.active_request = request
+        self.active_trace = get_metrics().start_trace(
+            "llm", provider, selected_model, start=request.submitted_at,
+            backend="http" if isinstance(request, ProviderRequest) else "tgpt"
+        )
+        request.chunk_received.connect(lambda chunk, r=request: self.on_ai_chunk(r, chunk))
+        request.finished.connect(lambda text, r=request: self.on_ai_request_done(r, text))
+        request.failed.connect(lambda error, r=request: self.on_ai_request_done(r, None, error))
+        request.timed_out.connect(lambda r=request: self.on_ai_request_done(r, None, "[Error]: Request timed out"))
+        request.cancelled.connect(lambda r=request: self.on_ai_request_done(r, None))
+        self.send_button.setText("Stop")
+        self.voice_recognition_button.setEnabled(False)
+        get_request_engine().submit(request, cache_key)
+
+    def cancel_ai_response(self):
+        if self.active_request is not None:
+            self.active_request.cancel()
+
+    def interrupt_ai_response(self):
+        # Like cancel_ai_response, but the answer is wrapped up right away
+        # (partial text saved, trace ended) instead of when the cancelled
+        # signal arrives, so a new request can start straight after
+        request = self.active_request
+        if request is None:
+            return
+        request.cancel()
+        if request is self.active_request:
+            self.on_ai_request_done(request, None)
+
+    def dispose(self):
+        # Called right before deleteLater(). The request's signals are wired to
+        # lambdas that outlive this window, so forget the request first: any
+        # queued chunk or cancelled signal then returns before touching widgets.
+        request, self.active_request = self.active_request, None
+        if request is not None:
+            request.cancel()
+
+        # Traces still waiting on this window would otherwise never be recorded
+        if self.active_trace is not None:
+            self.active_trace.end("cancelled")
+            self.active_trace = None
+        if self.render_trace is not None:
+            trace, status = self.render_trace
+            trace.end(status, render="interrupted")
+            self.render_trace = None
+        if self.voice_trace is not None:
+            self.voice_trace.end("cancelled")
+            self.voice_trace = None
+
+        # A QThread destroyed while running aborts the process, and the worker
+        # is a child of this window; end dictation and wait for it
+        worker, self.voice_worker = self.voice_worker, None
+        if worker is not None:
+            worker.blockSignals(True)  # nothing left to show the result in
+            worker.stop()
+            worker.wait()
+
+    def on_ai_chunk(self, request, chunk):
+        if request is not self.active_request:
+            return
+        if self.stream_bubble is None:
+            if not chunk.strip():
+                return
+            print(f"[LLM] First token after {(request.first_chunk_at - request.submitted_at) * 1000:.0f} ms")
+            chunk = chunk.lstrip()
+            if self.rendered_end < len(self.message_history):
+                self.show_latest_messages()
+            self.stream_text = ""
+            self.stream_bubble = self.create_message_bubble("AI", "", selectable=True)
+        self.stream_text += chunk
+        self.stream_bubble.message_label.append_text(chunk)
+
+    def on_ai_request_done(self, request, response, error=None):
+        if request is not self.active_request:
+            return
+        self.active_request = None
+        self.send_button.setText("Send")
+        self.voice_recognition_button.setEnabled(True)
+
+        trace, self.active_trace = self.active_trace, None
+        # Cache hits and followers of a shared call are recorded apart from
+        # real provider calls so they don't drag the latency percentiles down
+        trace.source = request.source
+        for span, at in (("spawn", request.spawned_at), ("first_byte", request.first_chunk_at),
+                         ("last_byte", request.last_chunk_at)):
+            if at is not None:
+                trace.mark(span, at)
+        status = "error" if error else "cancelled" if response is None else "ok"
+
+        if self.stream_bubble is not None:
+            # Already on screen; keep whatever arrived and note any error
+            text = response if response is not None else self.stream_text.strip()
+            if error:
+                text += f"\n{error}"
+                self.stream_bubble.message_label.append_text(f"\n{error}")
+            self.finish_stream(text)
+            self.finish_llm_trace(trace, status)
+            return
 
-        if self.typing_speed == 0:
-            formatted_text = self.typing_text.replace('\n', '<br>')
-            self.typing_label.setText(f"<b>AI:</b> {formatted_text}")
-        else:
-            if self.typing_timer:
-                self.killTimer(self.typing_timer)
-            self.typing_timer = self.startTimer(self.typing_speed)
-
-    def timerEvent(self, event: QTimerEvent):
-        if self.typing_index < len(self.typing_text):
-            safe_text = self.typing_text[:self.typing_index + 1].replace("\n", "<br>")
-            self.typing_label.setText(f"<b>AI:</b> {safe_text}")
-            self.typing_index += 1
+        if error:
+            response = error
+        if response is None:
+            print("[LLM] Request cancelled")
+            trace.end(status)
+            return
+        # Backend produced no incremental output; fall back to the typing effect
+        self.show_ai_response(response)
+        label = self.message_bubbles[-1].message_label
+        if label.is_typing():
+            self.render_trace = (trace, status)
+            label.typing_finished.connect(lambda: self.finish_llm_trace(trace, status))
         else:
-            self.killTimer(self.typing_timer)
-            self.typing_timer = None
+            self.finish_llm_trace(trace, status)
+
+    def finish_llm_trace(self, trace, status):
+        if self.render_trace is not None and self.render_trace[0] is trace:
+            self.render_trace = None
+        if trace.status is None:
+            trace.mark("render_complete")
+            trace.end(status)
+
+    def finish_stream(self, text):
+        bubble_widget = self.stream_bubble
+        bubble_widget.message_text = text
+        self.stream_bubble = None
+        self.stream_text = ""
+        self.session.append_message("AI", text)
+        self.adopt_bubble(bubble_widget)
+        self.tray_ref.chat_manager.chat_changed(self.session)
+
+    def show_ai_response(self, response):
+        self.add_message("AI", response, selectable=True, animate=self.typing_speed > 0)
 
     def speak_text(self, text: str):
-        async def run():
-            
-            if os.path.exists("response.mp3"):
-                os.remove("response.mp3")
-            communicate = Communicate(text, voice=self.tts_voice)
-            await communicate.save("response.mp3")
-            playsound("response.mp3")
+        # Imported on first use; pulls in edge-tts and playsound
+        from config.tts_pipeline import speak, stop_speaking, is_speaking
+
+        # Pressing the speaker again on the message being read stops it
+        if is_speaking(text):
+            stop_speaking()
+            return
+        speak(text, self.tts_voice)
+
 
-        threading.Thread(target=lambda: asyncio.run(run())).start()
+    def start_voice_recognition(self, requested_at=None):
+        requested_at = requested_at or time.perf_counter()
+        if self.voice_worker is not None:
+            # Mic pressed again while listening: stop and send what was heard
+            self.voice_worker.stop()
+            return
 
+        from config.vad import DEFAULT_ENDPOINT_MS
+        from config.voice_worker import VoiceRecognitionWorker
 
-    def start_voice_recognition(self):
         async def startSound():
+            from playsound3 import playsound
             playsound("assets/Listening-start.mp3")
         threading.Thread(target=lambda: asyncio.run(startSound())).start()
 
-
-        print("[Voice] Listening for speech...")
-        q = queue.Queue()
-
-        def callback(indata, frames, time, status):
-            if status:
-                print("[Audio Status]:", status)
-            q.put(bytes(indata))
-
-        try:
-            rec = KaldiRecognizer(self.model, 16000)
-            with sd.RawInputStream(samplerate=16000, blocksize=8000, dtype='int16',
-                                channels=1, callback=callback):
-                result_text = ""
-                import time
-                silence_threshold = 2  # 500ms
-                last_speech_time = time.time()
-
-                # Create and add an updating message bubble
-                temp_bubble = QLabel("<b>You:</b> <i>listening...</i>")
-                temp_bubble.setWordWrap(True)
-                temp_bubble.setTextInteractionFlags(Qt.TextSelectableByMouse)
-                temp_bubble.setStyleSheet("background-color: #002b4d; color: #6688cc; border-radius: 6px; padding: 6px;")
-                self.chat_content.addWidget(temp_bubble)
-                QApplication.processEvents()
-
-                while True:
-                    data = q.get()
-                    if rec.AcceptWaveform(data):
-                        result = json.loads(rec.Result())
-                        if result.get("text"):
-                            result_text += result["text"] + " "
-                            temp_bubble.setText(f"<b>You:</b> {result_text.strip()}")
-                            last_speech_time = time.time()
-                    else:
-                        partial = json.loads(rec.PartialResult()).get("partial", "")
-                        if partial.strip():
-                            temp_bubble.setText(f"<b>You:</b> {result_text.strip()} {partial}")
-                            last_speech_time = time.time()
-
-                    QApplication.processEvents()
-                    if time.time() - last_speech_time > silence_threshold:
-                        break
-
-                final_result = json.loads(rec.FinalResult())
-                if final_result.get("text"):
-                    result_text += final_result["text"]
-
-                prompt = result_text.strip()
-                if prompt:
-                    print("[Voice] Recognized:", prompt)
-                    temp_bubble.setText(f"<b>You:</b> {prompt}")
-                    self.get_ai_response(prompt)
-                else:
-                    print("[Voice] No prompt recognized.")
-                    temp_bubble.deleteLater()
-
-                async def endSound():
-                    playsound("assets/Listening-end.mp3")
-                threading.Thread(target=lambda: asyncio.run(endSound())).start()
-
-        except Exception as e:
-            print(f"[Voice Error]: {e}")
+        # Create and add an updating message bubble
+        self.voice_bubble = QLabel("<b>You:</b> <i>listening...</i>")
+        self.voice_bubble.setWordWrap(True)
+        self.voice_bubble.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.voice_bubble.setStyleSheet("background-color: #002b4d; color: #6688cc; border-radius: 6px; padding: 6px;")
+        self.chat_content.insertWidget(self.chat_content.count() - 1, self.voice_bubble)
+        self.scroll_to_bottom()
+
+        warm_pipeline = getattr(self.tray_ref, "warm_audio", None)
+        self.voice_trace = get_metrics().start_trace(
+            "voice", "vosk", os.path.basename(VOSK_MODEL_PATH), start=requested_at,
+            mode="warm" if warm_pipeline is not None else "cold"
+        )
+        self.voice_worker = VoiceRecognitionWorker(
+            self, warm_pipeline, self.config.get("voice_endpoint_ms", DEFAULT_ENDPOINT_MS)
+        )
+        self.voice_worker.listening.connect(
+            lambda warm=warm_pipeline is not None: print(
+                f"[Voice] Listening {(time.perf_counter() - requested_at) * 1000:.0f} ms after request"
+                f" ({'warm' if warm else 'cold'})"
+            )
+        )
+        self.voice_worker.partial_text.connect(self.on_voice_partial)
+        self.voice_worker.final_text.connect(self.on_voice_final)
+        self.voice_worker.failed.connect(lambda error: print(f"[Voice Error]: {error}"))
+        self.voice_worker.failed.connect(lambda error, trace=self.voice_trace: trace.fields.update(error=error))
+        self.voice_worker.finished.connect(self.on_voice_finished)
+        self.voice_worker.start()
+
+    def on_voice_partial(self, text):
+        if self.voice_bubble is not None:
+            self.voice_bubble.setText(f"<b>You:</b> {text}")
+
+    def on_voice_final(self, prompt):
+        if prompt:
+            print("[Voice] Recognized:", prompt)
+            # The hotkey can start dictation while an answer is still coming in
+            self.interrupt_ai_response()
+            self.add_message("You", prompt, selectable=True)
+            self.get_ai_response(prompt)
+        else:
+            print("[Voice] No prompt recognized.")
+
+        async def endSound():
+            from playsound3 import playsound
+            playsound("assets/Listening-end.mp3")
+        threading.Thread(target=lambda: asyncio.run(endSound())).start()
+
+    def on_voice_finished(self):
+        if self.voice_worker is None:
+            return  # already torn down by dispose()
+        worker, trace = self.voice_worker, self.voice_trace
+        for span, at in (("listening", worker.listening_at), ("first_partial", worker.first_partial_at),
+                         ("speech_end", worker.speech_ended_at), ("final", worker.final_at)):
+            if at is not None:
+                trace.mark(span, at)
+        # Time the recognizer needed after the user stopped talking
+        trace.span("recognizer", worker.speech_ended_at, worker.final_at)
+        trace.end("error" if "error" in trace.fields else "ok" if worker.final_at else "cancelled")
+        self.voice_trace = None
+
+        if self.voice_bubble is not None:
+            self.voice_bubble.deleteLater()
+            self.voice_bubble = None
+        self.voice_worker.deleteLater()
+        self.voice_worker = None
 
     def to_dict(self):
-        return {
-            "id": self.chat_id,
-            "name": getattr(self, "custom_name", "Chat"),
-            "model": self.model_name,
-            "history": self.message_history
-        }
+        return self.session.to_dict()
     
\ No newline at end of file
@@ -1,31 +1,161 @@
 import os
+import sqlite3
+import threading
+import uuid
 import yaml
 
-CHAT_HISTORY_PATH = os.path.join("config", "chat_history.yaml")
+CHAT_HISTORY_PATH = os.path.join("config", "chat_history.yaml")  # legacy, migrated on first run
+CHAT_DB_PATH = os.path.join("config", "chat_history.db")
 
-def load_chat_history():
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS chats (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    model TEXT NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS messages (
+    chat_id TEXT NOT NULL,
+    seq INTEGER NOT NULL,
+    sender TEXT NOT NULL,
+    text TEXT NOT NULL,
+    PRIMARY KEY (chat_id, seq)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+_lock = threading.RLock()
+_conn = None
+
+
+def _get_connection():
+    global _conn
+    with _lock:
+        if _conn is None:
+            os.makedirs(os.path.dirname(CHAT_DB_PATH), exist_ok=True)
+            conn = sqlite3.connect(CHAT_DB_PATH, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            _migrate_yaml(conn)
+            # Messages whose chat row is gone can't be loaded; drop them
+            with conn:
+                conn.execute("DELETE FROM messages WHERE chat_id NOT IN (SELECT id FROM chats)")
+            _conn = conn
+        return _conn
+
+
+def _migrate_yaml(conn):
     if not os.path.exists(CHAT_HISTORY_PATH):
-        return []
+        return
+    # Recorded in the same transaction as the import, so a failed run is
+    # retried on the next start even if chats were saved in between
+    if conn.execute("SELECT 1 FROM meta WHERE key = 'yaml_migrated'").fetchone():
+        return
 
-    with open(CHAT_HISTORY_PATH, "r") as f:
-        data = yaml.safe_load(f) or {}
-        return data.get("chats", [])
+    try:
+        with open(CHAT_HISTORY_PATH, "r") as f:
+            data = yaml.safe_load(f) or {}
+        chats = data.get("chats") or []
+    except Exception as e:
+        print("[ChatHistory] YAML migration failed:", e)
+        return
 
-def save_chat_history(chats):
-    os.makedirs(os.path.dirname(CHAT_HISTORY_PATH), exist_ok=True)
-    with open(CHAT_HISTORY_PATH, "w") as f:
-        yaml.safe_dump({"chats": chats}, f)
+    row = conn.execute("SELECT MAX(position) FROM chats").fetchone()
+    position = 0 if row[0] is None else row[0] + 1
+    migrated = 0
+    with conn:
+        for chat in chats:
+            try:
+                chat = dict(chat, id=chat.get("id") or str(uuid.uuid4()))
+                history = [(sender, text) for sender, text in chat.get("history") or []]
+            except Exception as e:
+                print("[ChatHistory] Skipping malformed chat in YAML:", e)
+                continue
+            _upsert_chat(conn, chat, position)
+            _append_messages(conn, chat["id"], 0, history)
+            position += 1
+            migrated += 1
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('yaml_migrated', '1')")
+    try:
+        os.replace(CHAT_HISTORY_PATH, CHAT_HISTORY_PATH + ".migrated")
+    except OSError as e:
+        print("[ChatHistory] Could not rename migrated YAML:", e)
+    print(f"[ChatHistory] Migrated {migrated} of {len(chats)} chats from YAML to SQLite.")
+
+
+def _upsert_chat(conn, chat, position):
+    conn.execute(
+        "INSERT INTO chats (id, name, model, position) VALUES (?, ?, ?, ?) "
+        "ON CONFLICT(id) DO UPDATE SET name = excluded.name, model = excluded.model, "
+        "position = excluded.position",
+        (chat["id"], chat.get("name", "Chat"), chat.get("model", "phind"), position)
+    )
+
+
+def _append_messages(conn, chat_id, start_seq, messages):
+    conn.executemany(
+        "INSERT OR REPLACE INTO messages (chat_id, seq, sender, text) VALUES (?, ?, ?, ?)",
+        [(chat_id, start_seq + i, sender, text) for i, (sender, text) in enumerate(messages)]
+    )
 
-def delete_chat(self, index):
-    chat = self.tray_ref.chat_windows[index]
 
-    # Hide and remove manually
-    chat.hide()
-    self.tray_ref.chat_windows.pop(index)
-    chat.deleteLater()
+def _sync_chat(conn, chat, position):
+    _upsert_chat(conn, chat, position)
+    history = chat.get("history", [])
+    stored = _message_count(conn, chat["id"])
+    if stored > len(history):
+        conn.execute("DELETE FROM messages WHERE chat_id = ? AND seq >= ?", (chat["id"], len(history)))
+        stored = len(history)
+    # History is append-only, so only the unsaved tail needs writing
+    _append_messages(conn, chat["id"], stored, history[stored:])
 
-    # Now it's safely gone from the list — save to YAML
-    self.tray_ref.save_all_chats()
-    self.refresh()
 
+def _delete_chat(conn, chat_id):
+    conn.execute("DELETE FROM messages WHERE chat_id = ?", (chat_id,))
+    conn.execute("DELETE FROM chats WHERE id = ?", (chat_id,))
+
+
+def _message_count(conn, chat_id):
+    row = conn.execute("SELECT MAX(seq) FROM messages WHERE chat_id = ?", (chat_id,)).fetchone()
+    return 0 if row[0] is None else row[0] + 1
+
+
+def load_chat_history():
+    conn = _get_connection()
+    with _lock:
+        chats = conn.execute("SELECT id, name, model FROM chats ORDER BY position").fetchall()
+        histories = {}
+        for chat_id, sender, text in conn.execute(
+            "SELECT chat_id, sender, text FROM messages ORDER BY chat_id, seq"
+        ):
+            histories.setdefault(chat_id, []).append([sender, text])
+
+    return [
+        {"id": chat_id, "name": name, "model": model, "history": histories.get(chat_id, [])}
+        for chat_id, name, model in chats
+    ]
+
+
+def write_chat_changes(changed, deleted_ids=()):
+    conn = _get_connection()
+    with _lock, conn:
+        for chat, position in changed:
+            _sync_chat(conn, chat, position)
+        for chat_id in deleted_ids:
+            _delete_chat(conn, chat_id)
+
+
+def save_chat_history(chats):
+    conn = _get_connection()
+    with _lock, conn:
+        for position, chat in enumerate(chats):
+            _sync_chat(conn, chat, position)
 
+        keep_ids = {chat["id"] for chat in chats}
+        stale = [row[0] for row in conn.execute("SELECT id FROM chats") if row[0] not in keep_ids]
+        for chat_id in stale:
+            _delete_chat(conn, chat_id)
@@ -0,0 +1,105 @@
+# config/chat_persistence.py
+import threading
+import time
+
+from config.chat_history_manager import write_chat_changes
+
+COALESCE_SECONDS = 0.25
+EXIT_FLUSH_TIMEOUT = 2.0
+
+
+class ChatPersistenceWriter(threading.Thread):
+    def __init__(self, coalesce_seconds=COALESCE_SECONDS):
+        super().__init__(name="ChatPersistenceWriter", daemon=True)
+        self.coalesce_seconds = coalesce_seconds
+        self.session_source = lambda: []
+        self._cond = threading.Condition()
+        self._dirty = {}
+        self._deleted = set()
+        self._flush_requested = False
+        self._writing = False
+        self._stopping = False
+
+    def mark_dirty(self, session):
+        with self._cond:
+            self._dirty[session.chat_id] = session
+            self._deleted.discard(session.chat_id)
+            self._cond.notify_all()
+
+    def mark_deleted(self, chat_id):
+        with self._cond:
+            self._dirty.pop(chat_id, None)
+            self._deleted.add(chat_id)
+            self._cond.notify_all()
+
+    def flush(self, timeout=EXIT_FLUSH_TIMEOUT):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            if self._dirty or self._deleted:
+                self._flush_requested = True
+                self._cond.notify_all()
+            while self._dirty or self._deleted or self._writing:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.is_alive():
+                    print("[ChatHistory] Flush timed out; some changes may not be saved.")
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def stop(self, timeout=EXIT_FLUSH_TIMEOUT):
+        flushed = self.flush(timeout)
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        return flushed
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not (self._dirty or self._deleted or self._stopping):
+                    self._cond.wait()
+                if self._stopping and not (self._dirty or self._deleted):
+                    return
+
+                # Let a burst of notifications (send, reply, rename...) settle
+                # into a single write
+                deadline = time.monotonic() + self.coalesce_seconds
+                while not (self._flush_requested or self._stopping):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                dirty, deleted = self._dirty, self._deleted
+                self._dirty, self._deleted = {}, set()
+                self._flush_requested = False
+                self._writing = True
+
+            try:
+                self._write(dirty, deleted)
+            except Exception as e:
+                print("[ChatHistory] Background save failed:", e)
+            finally:
+                with self._cond:
+                    self._writing = False
+                    self._cond.notify_all()
+
+    def _write(self, dirty, deleted):
+        positions = {session.chat_id: i for i, session in enumerate(list(self.session_source()))}
+        changed = []
+        for chat_id, session in dirty.items():
+            chat = session.to_dict()
+            chat["history"] = list(chat["history"])
+            changed.append((chat, positions.get(chat_id, len(positions))))
+        write_chat_changes(changed, deleted)
+
+
+_writer = None
+
+
+def get_persistence_writer():
+    global _writer
+    if _writer is None:
+        _writer = ChatPersistenceWriter()
+        _writer.start()
+    return _writer
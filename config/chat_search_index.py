@@ -0,0 +1,149 @@
+# config/chat_search_index.py
+import re
+from collections import defaultdict, namedtuple
+
+WORD_RE = re.compile(r"\w+")
+SNIPPET_RADIUS = 45
+TITLE_WEIGHT = 5
+
+SearchHit = namedtuple("SearchHit", ["chat_id", "score", "snippet"])
+
+
+def _trigrams(word):
+    return {word[i:i + 3] for i in range(len(word) - 2)}
+
+
+def make_snippet(text, query, radius=SNIPPET_RADIUS):
+    flat = text.replace("\n", " ")
+    pos = flat.lower().find(query)
+    if pos == -1:
+        tokens = WORD_RE.findall(query)
+        pos = flat.lower().find(tokens[0]) if tokens else -1
+    if pos == -1:
+        return flat[:radius * 2] + ("…" if len(flat) > radius * 2 else "")
+    start = max(pos - radius, 0)
+    end = min(pos + len(query) + radius, len(flat))
+    return ("…" if start > 0 else "") + flat[start:end].strip() + ("…" if end < len(flat) else "")
+
+
+class ChatSearchIndex:
+    # Messages are indexed by word; words are in turn indexed by trigram so a
+    # query fragment like "sql" finds "postgresql" without scanning messages.
+    def __init__(self):
+        self._docs = {}                          # doc_id -> (chat_id, text)
+        self._chat_docs = defaultdict(list)      # chat_id -> [doc_id]
+        self._postings = defaultdict(set)        # word -> {doc_id}
+        self._word_trigrams = defaultdict(set)   # trigram -> {word}
+        self._titles = {}                        # chat_id -> lowered title
+        self._pending = {}                       # chat_id -> session not yet indexed
+        self._next_id = 0
+
+    def add_session(self, session):
+        # Indexed on the first search so startup doesn't pay for it
+        self.set_title(session)
+        self._pending[session.chat_id] = session
+
+    def set_title(self, session):
+        self._titles[session.chat_id] = f"{session.custom_name} ({session.model_name})".lower()
+
+    def add_message(self, chat_id, text):
+        if chat_id in self._pending:
+            return  # picked up from the full history when the chat is indexed
+        doc_id = self._next_id
+        self._next_id += 1
+        self._docs[doc_id] = (chat_id, text)
+        self._chat_docs[chat_id].append(doc_id)
+        for word in set(WORD_RE.findall(text.lower())):
+            postings = self._postings[word]
+            if not postings:
+                for trigram in _trigrams(word):
+                    self._word_trigrams[trigram].add(word)
+            postings.add(doc_id)
+
+    def remove_chat(self, chat_id):
+        self._pending.pop(chat_id, None)
+        self._titles.pop(chat_id, None)
+        for doc_id in self._chat_docs.pop(chat_id, []):
+            _, text = self._docs.pop(doc_id)
+            for word in set(WORD_RE.findall(text.lower())):
+                postings = self._postings.get(word)
+                if postings is None:
+                    continue
+                postings.discard(doc_id)
+                if not postings:
+                    del self._postings[word]
+                    for trigram in _trigrams(word):
+                        words = self._word_trigrams.get(trigram)
+                        if words is not None:
+                            words.discard(word)
+                            if not words:
+                                del self._word_trigrams[trigram]
+
+    def search(self, query, limit=100):
+        self._index_pending()
+        query = query.strip().lower()
+        if not query:
+            return []
+        tokens = WORD_RE.findall(query)
+
+        # The words only narrow the candidates; a message matches when it
+        # contains the whole query, as in the old title/preview filter
+        matched_docs = None if tokens else set(self._docs)
+        for token in tokens:
+            docs = set()
+            for word in self._words_containing(token):
+                docs |= self._postings[word]
+            matched_docs = docs if matched_docs is None else matched_docs & docs
+            if not matched_docs:
+                break
+
+        hits = {}
+        for doc_id in matched_docs or ():
+            chat_id, text = self._docs[doc_id]
+            if query not in text.lower():
+                continue
+            best = hits.get(chat_id)
+            if best is None:
+                hits[chat_id] = [1, doc_id]
+            else:
+                best[0] += 1
+                # The newest matching message supplies the snippet
+                best[1] = max(best[1], doc_id)
+
+        for chat_id, title in self._titles.items():
+            if query in title:
+                hits.setdefault(chat_id, [0, None])[0] += TITLE_WEIGHT
+
+        ranked = sorted(hits.items(), key=lambda item: (item[1][0], -1 if item[1][1] is None else item[1][1]), reverse=True)
+        results = []
+        for chat_id, (score, doc_id) in ranked[:limit]:
+            snippet = make_snippet(self._docs[doc_id][1], query) if doc_id is not None else ""
+            results.append(SearchHit(chat_id, score, snippet))
+        return results
+
+    def _words_containing(self, token):
+        if len(token) < 3:
+            return [word for word in self._postings if token in word]
+        candidates = None
+        for trigram in _trigrams(token):
+            words = self._word_trigrams.get(trigram, set())
+            candidates = set(words) if candidates is None else candidates & words
+            if not candidates:
+                return []
+        return [word for word in candidates if token in word]
+
+    def _index_pending(self):
+        pending, self._pending = self._pending, {}
+        for chat_id, session in pending.items():
+            for _, message in session.message_history:
+                self.add_message(chat_id, message)
+
+
+_index = None
+
+
+def get_search_index():
+    global _index
+    if _index is None:
+        _index = ChatSearchIndex()
+    return _index
@@ -0,0 +1,66 @@
+# config/chat_session.py
+import time
+import uuid
+from config.chat_persistence import get_persistence_writer
+from config.chat_search_index import get_search_index
+from config.context_builder import ContextBuilder
+
+
+NO_MESSAGES_PREVIEW = "(No messages yet)"
+
+
+def make_preview(message):
+    last_msg = message.strip().replace('\n', ' ')
+    lines = last_msg.split('. ')
+    preview = ". ".join(lines[:2])
+    return preview[:100] + ("…" if len(preview) > 100 else "")
+
+
+class ChatSession:
+    def __init__(self, chat_id=None, name="Chat", model="phind", history=None):
+        self.chat_id = chat_id or str(uuid.uuid4())
+        self.custom_name = name
+        self.model_name = model
+        self.message_history = history if history is not None else []
+        self.window = None  # ChatWindow, built on first open
+        self.context = ContextBuilder()  # token counts and summary for outgoing prompts
+
+        # Cached summary for the Chat Manager, kept current by append_message
+        self.message_count = len(self.message_history)
+        self.last_activity = None
+        self.last_user_message = None
+        for sender, message in reversed(self.message_history):
+            if sender == "You":
+                self.last_user_message = message
+                break
+        self.preview = make_preview(self.last_user_message) if self.last_user_message else NO_MESSAGES_PREVIEW
+
+    @classmethod
+    def from_dict(cls, data, index=0):
+        return cls(
+            chat_id=data.get("id"),
+            name=data.get("name", f"Chat {index + 1}"),
+            model=data.get("model", "phind"),
+            history=data.get("history", []),
+        )
+
+    def append_message(self, sender, message):
+        self.message_history.append((sender, message))
+        self.message_count += 1
+        self.last_activity = time.time()
+        if sender == "You":
+            self.last_user_message = message
+            self.preview = make_preview(message)
+        get_search_index().add_message(self.chat_id, message)
+        self.mark_dirty()
+
+    def mark_dirty(self):
+        get_persistence_writer().mark_dirty(self)
+
+    def to_dict(self):
+        return {
+            "id": self.chat_id,
+            "name": self.custom_name,
+            "model": self.model_name,
+            "history": self.message_history
+        }
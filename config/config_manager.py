@@ -1,3 +1,4 @@
+import copy
 import os
 import yaml
 
@@ -23,9 +24,28 @@ DEFAULT_CONFIG = {
         "pollinations": True
     },
     "openai_url": "api.openai.com/v1",
+    # "http" talks to the provider directly; "tgpt" spawns the tgpt CLI
+    "provider_backends": {
+        "openai": "http",
+        "gemini": "http",
+        "groq": "http",
+        "deepseek": "http",
+        "ollama": "http",
+        "phind": "tgpt",
+        "pollinations": "tgpt"
+    },
+    # Per-provider base URL overrides, e.g. a local OpenAI-compatible server
+    "provider_endpoints": {},
     "selected_model": "phind",
     "text_speed": 20,
+    "stream_responses": True,
+    "cache_responses": False,
     "tts_voice": "en-GB-RyanNeural",
+    "voice_warm_mode": False,
+    "voice_endpoint_ms": 1500,   # silence after speech that ends dictation
+    # Latency traces to config/traces.jsonl and a Prometheus endpoint on 127.0.0.1
+    "metrics_enabled": False,
+    "metrics_port": 9477,
     "run_on_startup": False 
 }
 
@@ -33,7 +53,7 @@ DEFAULT_CONFIG = {
 def load_config():
     if not os.path.exists(CONFIG_PATH):
         save_config(DEFAULT_CONFIG)
-        return DEFAULT_CONFIG.copy()
+        return copy.deepcopy(DEFAULT_CONFIG)
 
     with open(CONFIG_PATH, "r") as f:
         try:
@@ -41,7 +61,7 @@ def load_config():
             if not isinstance(config, dict):
                 raise ValueError("Invalid config format")
         except Exception:
-            config = DEFAULT_CONFIG.copy()
+            config = copy.deepcopy(DEFAULT_CONFIG)
 
     # Ensure all default keys are present
     def deep_update(d, u):
@@ -52,10 +72,14 @@ def load_config():
                 d.setdefault(k, v)
         return d
 
-    return deep_update(config, DEFAULT_CONFIG.copy())
+    return deep_update(config, copy.deepcopy(DEFAULT_CONFIG))
 
 
 def save_config(config):
+    # Write to a temp file and swap it in, so a crash or a reader (the
+    # config file watcher) never sees a half-written file
     os.makedirs(os.path.dirname(CONFIG_PATH), exist_ok=True)
-    with open(CONFIG_PATH, "w") as f:
+    tmp_path = CONFIG_PATH + ".tmp"
+    with open(tmp_path, "w") as f:
         yaml.dump(config, f)
+    os.replace(tmp_path, CONFIG_PATH)
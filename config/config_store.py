@@ -0,0 +1,108 @@
+# config/config_store.py
+import copy
+import os
+
+from PyQt5.QtCore import QObject, QTimer, QFileSystemWatcher, pyqtSignal
+
+from config.config_manager import CONFIG_PATH, load_config, save_config
+
+SAVE_DELAY_MS = 500
+RELOAD_DELAY_MS = 100  # editors often save in several steps
+
+
+class ConfigStore(QObject):
+    # One per top-level key whose value actually changed
+    value_changed = pyqtSignal(str, object)
+    # Once per update, with every key that changed in it
+    config_changed = pyqtSignal(list)
+
+    def __init__(self, path=CONFIG_PATH):
+        super().__init__()
+        self.path = path
+        # Shared by every window; mutate it only through set()/update()
+        self.config = load_config()
+        self._snapshot = copy.deepcopy(self.config)
+        self._unsaved = set()
+
+        self._save_timer = QTimer(self)
+        self._save_timer.setSingleShot(True)
+        self._save_timer.setInterval(SAVE_DELAY_MS)
+        self._save_timer.timeout.connect(self.flush)
+
+        self._reload_timer = QTimer(self)
+        self._reload_timer.setSingleShot(True)
+        self._reload_timer.setInterval(RELOAD_DELAY_MS)
+        self._reload_timer.timeout.connect(self.reload)
+
+        self._watcher = QFileSystemWatcher(self)
+        self._watcher.fileChanged.connect(self._on_file_changed)
+        self._watch()
+
+    def get(self, key, default=None):
+        return self.config.get(key, default)
+
+    def set(self, key, value):
+        self.update({key: value})
+
+    def update(self, values):
+        for key, value in values.items():
+            self.config[key] = copy.deepcopy(value)
+        changed = self._broadcast()
+        if changed:
+            self._unsaved.update(changed)
+            self._save_timer.start()  # restarts the debounce window
+        return changed
+
+    def flush(self):
+        self._save_timer.stop()
+        if not self._unsaved:
+            return
+        try:
+            save_config(self.config)
+            self._unsaved.clear()
+        except OSError as e:
+            print("[Config] Save failed:", e)
+        self._watch()
+
+    def reload(self):
+        # Picks up edits made outside the app. Keys changed here but not yet
+        # written keep their in-memory value.
+        if not os.path.exists(self.path):
+            return
+        disk = load_config()
+        for key, value in disk.items():
+            if key not in self._unsaved:
+                self.config[key] = value
+        changed = self._broadcast()
+        if changed:
+            print(f"[Config] Reloaded from disk: {', '.join(changed)}")
+        self._watch()
+
+    def _broadcast(self):
+        changed = [key for key in self.config if self._snapshot.get(key) != self.config[key]]
+        if not changed:
+            return []
+        for key in changed:
+            self._snapshot[key] = copy.deepcopy(self.config[key])
+        for key in changed:
+            self.value_changed.emit(key, self.config[key])
+        self.config_changed.emit(changed)
+        return changed
+
+    def _watch(self):
+        # An atomic replace swaps the inode, which drops the file from the watcher
+        if os.path.exists(self.path) and self.path not in self._watcher.files():
+            self._watcher.addPath(self.path)
+
+    def _on_file_changed(self, path):
+        self._reload_timer.start()
+
+
+_store = None
+
+
+def get_config_store():
+    global _store
+    if _store is None:
+        _store = ConfigStore()
+    return _store
@@ -0,0 +1,136 @@
+# config/context_builder.py
+import re
+
+DEFAULT_TOKEN_BUDGET = 2000
+MODEL_TOKEN_BUDGETS = {
+    "gpt-3.5-turbo": 3000,
+    "gpt-4o": 6000,
+    "gemini-pro": 6000,
+    "deepseek-chat": 6000,
+    "mixtral": 4000,
+    "llama3": 3000,
+    "phind": 2000,
+    "isou": 2000,
+    "pollinations": 2000,
+    "llama3-local": 3000
+}
+SUMMARY_SHARE = 0.2             # part of the budget the rolled-up summary may use
+SUMMARY_REFRESH_INTERVAL = 6    # messages that may pile up before the summary is rebuilt
+SUMMARY_LINE_CHARS = 120
+MAX_RECENT_MESSAGES = 30
+
+# tgpt is launched through the shell; cmd.exe refuses lines over 8191 chars
+MAX_COMMAND_PROMPT_CHARS = 7000
+
+SENTENCE_END_RE = re.compile(r"(?<=[.!?])\s")
+
+
+def estimate_tokens(text):
+    # ~4 characters per token is close enough for English chat text
+    return max(1, (len(text) + 3) // 4)
+
+
+def clean_message(message):
+    return message.replace("\n", " | ").replace("\r", " ").strip()
+
+
+def first_sentence(message, limit=SUMMARY_LINE_CHARS):
+    text = " ".join(message.split())
+    text = SENTENCE_END_RE.split(text, 1)[0]
+    return text[:limit] + ("…" if len(text) > limit else "")
+
+
+class ContextBuilder:
+    def __init__(self):
+        self._token_counts = []      # per history index; history is append-only
+        self._summary = ""
+        self._summary_upto = 0       # history[:_summary_upto] is covered by the summary
+
+    def build(self, history, model):
+        self._count_tokens(history)
+        budget = MODEL_TOKEN_BUDGETS.get(model, DEFAULT_TOKEN_BUDGET)
+        recent_budget = int(budget * (1 - SUMMARY_SHARE))
+
+        start = len(history)
+        used = 0
+        while start > 0 and len(history) - start < MAX_RECENT_MESSAGES:
+            cost = self._token_counts[start - 1]
+            if used + cost > recent_budget and start < len(history):
+                break
+            used += cost
+            start -= 1
+
+        summary = ""
+        if start > 0:
+            stale = (
+                not self._summary
+                or self._summary_upto > start
+                or start - self._summary_upto >= SUMMARY_REFRESH_INTERVAL
+            )
+            if stale:
+                self._summary = self._summarize(history[:start], budget - recent_budget)
+                self._summary_upto = start
+            # Turns between the cached summary and the window stay verbatim
+            start = self._summary_upto
+            summary = self._summary
+
+        return summary, list(history[start:])
+
+    def build_messages(self, history, model):
+        # Chat-completion messages for the HTTP providers
+        summary, recent = self.build(history, model)
+        messages = []
+        if summary:
+            messages.append({"role": "system", "content": f"Summary of earlier conversation: {summary}"})
+        for sender, msg in recent:
+            messages.append({"role": "user" if sender == "You" else "assistant", "content": msg})
+        return messages
+
+    def format_prompt(self, history, model, max_chars=None):
+        # Single-line prompt for tgpt
+        summary, recent = self.build(history, model)
+        recent = [(sender, clean_message(msg)) for sender, msg in recent]
+        if max_chars:
+            summary, recent = self._fit_chars(summary, recent, max_chars)
+        blocks = [f"{sender}: {msg}" for sender, msg in recent]
+        if summary:
+            blocks.insert(0, f"Summary of earlier conversation: {summary}")
+        # Use double-pipe to separate message blocks
+        return " || ".join(blocks)
+
+    def _count_tokens(self, history):
+        if len(self._token_counts) > len(history):
+            self._token_counts = []  # history was replaced; start over
+            self._summary, self._summary_upto = "", 0
+        for sender, msg in history[len(self._token_counts):]:
+            self._token_counts.append(estimate_tokens(f"{sender}: {clean_message(msg)}"))
+
+    def _summarize(self, older, token_budget):
+        lines = []
+        used = 0
+        # Walk backwards so the most recent of the older turns survive
+        for sender, msg in reversed(older):
+            line = f"{sender}: {first_sentence(msg)}"
+            cost = estimate_tokens(line)
+            if used + cost > token_budget:
+                break
+            lines.append(line)
+            used += cost
+        skipped = len(older) - len(lines)
+        lines.reverse()
+        if skipped:
+            lines.insert(0, f"({skipped} earlier messages omitted)")
+        return " / ".join(lines)
+
+    def _fit_chars(self, summary, recent, max_chars):
+        def length():
+            return len(summary) + sum(len(sender) + len(msg) + 6 for sender, msg in recent)
+
+        while length() > max_chars and len(recent) > 1:
+            recent = recent[1:]
+        if length() > max_chars and summary:
+            summary = ""
+        if length() > max_chars and recent:
+            sender, msg = recent[-1]
+            recent = [(sender, msg[-(max_chars - len(sender) - 6):])]
+        return summary, recent
@@ -0,0 +1,236 @@
+# config/metrics.py
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from config.vosk_model_registry import get_vosk_model_stats
+
+TRACE_PATH = os.path.join("config", "traces.jsonl")
+TRACE_MAX_BYTES = 5 * 1024 * 1024
+TRACE_BACKUPS = 3
+DEFAULT_METRICS_PORT = 9477
+SUMMARY_WINDOW = 1000  # recent samples per series used for p50/p95
+QUANTILES = (0.5, 0.95)
+
+
+# Timing marks for one LLM request, TTS playback or voice session.
+# Timestamps are time.perf_counter() values; spans are stored in ms.
+class Trace:
+    def __init__(self, recorder, kind, provider, model, start=None, **fields):
+        self.recorder = recorder
+        self.kind = kind
+        self.provider = provider
+        self.model = model
+        self.start = start if start is not None else time.perf_counter()
+        self.started_wall = time.time() - (time.perf_counter() - self.start)
+        self.fields = fields
+        self.spans = {}
+        self.status = None
+        # "call" for real work; anything else (a cache hit, a shared call)
+        # is counted but kept out of the latency series
+        self.source = "call"
+
+    def mark(self, name, at=None):
+        # Time from the start of the trace to `at` (default: now)
+        at = at if at is not None else time.perf_counter()
+        self.spans[name] = round((at - self.start) * 1000, 2)
+
+    def span(self, name, begin, end):
+        # Time between two timestamps; skipped if either never happened
+        if begin is not None and end is not None:
+            self.spans[name] = round((end - begin) * 1000, 2)
+
+    def end(self, status="ok", **fields):
+        if self.status is not None:
+            return  # already recorded
+        self.status = status
+        self.fields.update(fields)
+        self.mark("total")
+        self.recorder.record(self)
+
+    def to_dict(self):
+        return {
+            "ts": round(self.started_wall, 3),
+            "kind": self.kind,
+            "provider": self.provider,
+            "model": self.model,
+            "status": self.status,
+            "source": self.source,
+            "spans_ms": self.spans,
+            **self.fields
+        }
+
+
+class _Series:
+    def __init__(self):
+        self.samples = deque(maxlen=SUMMARY_WINDOW)
+        self.count = 0
+        self.total = 0.0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.total += value
+
+    def quantile(self, q):
+        ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+class MetricsRecorder:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._series = {}    # (kind, span, provider, model) -> _Series
+        self._outcomes = {}  # (kind, provider, model, status, source) -> count
+        self._trace_log = None
+        self._server = None
+
+    def start_trace(self, kind, provider, model, start=None, **fields):
+        return Trace(self, kind, provider, model, start, **fields)
+
+    def record(self, trace):
+        with self._lock:
+            if trace.source == "call":
+                for span, ms in trace.spans.items():
+                    key = (trace.kind, span, trace.provider, trace.model)
+                    self._series.setdefault(key, _Series()).add(ms / 1000)
+            key = (trace.kind, trace.provider, trace.model, trace.status, trace.source)
+            self._outcomes[key] = self._outcomes.get(key, 0) + 1
+            trace_log = self._trace_log
+        if trace_log is not None:
+            trace_log.info(json.dumps(trace.to_dict(), ensure_ascii=False))
+
+    def summary(self, kind, span, provider, model):
+        with self._lock:
+            series = self._series.get((kind, span, provider, model))
+            if series is None:
+                return None
+            return {"count": series.count, **{f"p{int(q * 100)}": series.quantile(q) for q in QUANTILES}}
+
+    def prometheus_text(self):
+        lines = [
+            "# HELP lucid_span_seconds Time from the start of a request to each phase, or of a measured step.",
+            "# TYPE lucid_span_seconds summary"
+        ]
+        with self._lock:
+            for (kind, span, provider, model), series in sorted(self._series.items()):
+                labels = dict(kind=kind, span=span, provider=provider, model=model)
+                for q in QUANTILES:
+                    lines.append(f"lucid_span_seconds{_labels(**labels, quantile=q)} {series.quantile(q):.6f}")
+                lines.append(f"lucid_span_seconds_sum{_labels(**labels)} {series.total:.6f}")
+                lines.append(f"lucid_span_seconds_count{_labels(**labels)} {series.count}")
+
+            lines.append("# HELP lucid_requests_total Finished traces by outcome.")
+            lines.append("# TYPE lucid_requests_total counter")
+            for (kind, provider, model, status, source), count in sorted(self._outcomes.items()):
+                labels = _labels(kind=kind, provider=provider, model=model, status=status, source=source)
+                lines.append(f"lucid_requests_total{labels} {count}")
+
+        # Shared speech model: how long it took to load and what it costs to keep
+        vosk_gauges = (
+            ("lucid_vosk_model_load_seconds", "Time taken to load the Vosk model.", "load_seconds"),
+            ("lucid_vosk_model_rss_delta_bytes", "Resident memory added by loading the Vosk model.", "rss_delta_bytes"),
+            ("lucid_vosk_model_refcount", "Dictation sessions currently holding the Vosk model.", "refcount"),
+        )
+        model_stats = get_vosk_model_stats()
+        for name, help_text, field in vosk_gauges:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for path, stats in sorted(model_stats.items()):
+                lines.append(f"{name}{_labels(model=os.path.basename(path))} {stats[field]}")
+        return "\n".join(lines) + "\n"
+
+    # --- Sinks ---
+    def configure(self, config):
+        # Spans are always summarized in memory; the trace file and the
+        # endpoint only run when metrics are enabled
+        if config.get("metrics_enabled", False):
+            self.enable_trace_file()
+            self.start_server(config.get("metrics_port", DEFAULT_METRICS_PORT))
+        else:
+            self.disable_trace_file()
+            self.stop_server()
+
+    def enable_trace_file(self, path=TRACE_PATH):
+        if self._trace_log is not None:
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(
+            path, maxBytes=TRACE_MAX_BYTES, backupCount=TRACE_BACKUPS, encoding="utf-8"
+        )
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        trace_log = logging.getLogger("lucid.traces")
+        trace_log.setLevel(logging.INFO)
+        trace_log.propagate = False
+        trace_log.addHandler(handler)
+        self._trace_log = trace_log
+
+    def disable_trace_file(self):
+        trace_log, self._trace_log = self._trace_log, None
+        if trace_log is not None:
+            for handler in list(trace_log.handlers):
+                trace_log.removeHandler(handler)
+                handler.close()
+
+    def start_server(self, port=DEFAULT_METRICS_PORT):
+        if self._server is not None:
+            if self._server.server_address[1] == port:
+                return
+            self.stop_server()
+        recorder = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?")[0] != "/metrics":
+                    self.send_error(404)
+                    return
+                body = recorder.prometheus_text().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        try:
+            # Loopback only; nothing here is meant to leave the machine
+            self._server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        except OSError as e:
+            print(f"[Metrics] Could not listen on 127.0.0.1:{port}:", e)
+            return
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="MetricsServer", daemon=True).start()
+        print(f"[Metrics] Serving http://127.0.0.1:{self._server.server_address[1]}/metrics")
+
+    def stop_server(self):
+        server, self._server = self._server, None
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+
+_recorder = None
+
+
+def get_metrics():
+    global _recorder
+    if _recorder is None:
+        _recorder = MetricsRecorder()
+    return _recorder
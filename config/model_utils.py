@@ -12,5 +12,23 @@ MODEL_PROVIDER_MAP = {
     "llama3-local": "ollama"
 }
 
+# Shown in the model dropdowns, in this order; local Ollama models follow
+BUILTIN_MODELS = [
+    "gpt-3.5-turbo", "gpt-4o", "gemini-pro", "deepseek-chat",
+    "mixtral", "llama3", "phind", "isou", "pollinations"
+]
+OLLAMA_FALLBACK_MODEL = "llama3-local"
+
 def get_provider_from_model(model: str) -> str:
     return MODEL_PROVIDER_MAP.get(model, "phind")
+
+def register_models(models, provider):
+    for model in models:
+        MODEL_PROVIDER_MAP.setdefault(model, provider)
+
+def get_available_models(config, ollama_models=()):
+    enabled_models = config.get("enabled_models", {})
+    models = list(BUILTIN_MODELS)
+    if enabled_models.get("ollama", False):
+        models.extend(ollama_models or [OLLAMA_FALLBACK_MODEL])
+    return [model for model in models if enabled_models.get(get_provider_from_model(model), False)]
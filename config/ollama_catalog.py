@@ -0,0 +1,113 @@
+# config/ollama_catalog.py
+import json
+import os
+import shutil
+import subprocess
+import threading
+import time
+import urllib.request
+
+from PyQt5.QtCore import QObject, pyqtSignal
+
+from config.model_utils import register_models
+
+OLLAMA_CATALOG_PATH = os.path.join("config", "ollama_models.json")
+OLLAMA_TAGS_URL = "http://localhost:11434/api/tags"
+CATALOG_TTL_SECONDS = 10 * 60
+FETCH_TIMEOUT = 5
+
+
+def _fetch_from_api():
+    with urllib.request.urlopen(OLLAMA_TAGS_URL, timeout=FETCH_TIMEOUT) as response:
+        data = json.loads(response.read())
+    return [m["name"] for m in data.get("models", []) if m.get("name")]
+
+
+def _fetch_from_cli():
+    # `ollama list` prints a table: NAME  ID  SIZE  MODIFIED
+    result = subprocess.run(["ollama", "list"], capture_output=True, text=True, timeout=FETCH_TIMEOUT)
+    lines = result.stdout.strip().splitlines()[1:]
+    return [line.split()[0] for line in lines if line.strip()]
+
+
+class OllamaCatalog(QObject):
+    models_changed = pyqtSignal(list)
+
+    def __init__(self, path=OLLAMA_CATALOG_PATH, ttl=CATALOG_TTL_SECONDS):
+        super().__init__()
+        self.path = path
+        self.ttl = ttl
+        self.models = []
+        self.fetched_at = 0.0
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self._load_cache()
+
+    def is_installed(self):
+        return shutil.which("ollama") is not None
+
+    def is_fresh(self):
+        return time.time() - self.fetched_at < self.ttl
+
+    def refresh(self, force=False):
+        # Never blocks: the fetch runs on a worker thread and models_changed
+        # fires if the list turned out different
+        if not self.is_installed() or (self.is_fresh() and not force):
+            return
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, name="OllamaCatalog", daemon=True).start()
+
+    def _refresh(self):
+        try:
+            try:
+                models = _fetch_from_api()
+            except Exception:
+                models = _fetch_from_cli()  # daemon not reachable over HTTP
+        except Exception as e:
+            print("[Ollama Model Detection Error]:", e)
+            return
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+        changed = models != self.models
+        self.models = models
+        self.fetched_at = time.time()
+        register_models(models, "ollama")
+        self._save_cache()
+        if changed:
+            print(f"[Ollama] {len(models)} local models found")
+            self.models_changed.emit(list(models))
+
+    def _load_cache(self):
+        try:
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            self.models = [name for name in data.get("models", []) if isinstance(name, str)]
+            self.fetched_at = float(data.get("fetched_at", 0))
+            register_models(self.models, "ollama")
+        except (OSError, ValueError):
+            pass
+
+    def _save_cache(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            with open(tmp_path, "w") as f:
+                json.dump({"models": self.models, "fetched_at": self.fetched_at}, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print("[Ollama] Could not cache model list:", e)
+
+
+_catalog = None
+
+
+def get_ollama_catalog():
+    global _catalog
+    if _catalog is None:
+        _catalog = OllamaCatalog()
+    return _catalog
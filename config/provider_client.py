@@ -0,0 +1,207 @@
+# config/provider_client.py
+import http.client
+import json
+import socket
+import ssl
+import threading
+from urllib.parse import urlsplit
+
+# OpenAI-compatible chat completion endpoints; phind, isou and pollinations
+# are only reachable through tgpt
+DEFAULT_ENDPOINTS = {
+    "openai": "https://api.openai.com/v1",
+    "groq": "https://api.groq.com/openai/v1",
+    "deepseek": "https://api.deepseek.com/v1",
+    "gemini": "https://generativelanguage.googleapis.com/v1beta/openai",
+    "ollama": "http://localhost:11434/v1"
+}
+
+# Dropdown names -> API model ids. gemini-pro is retired and not served by
+# Gemini's OpenAI-compatible endpoint, so it is sent as gemini-1.5-flash.
+MODEL_ALIASES = {
+    "gemini-pro": "gemini-1.5-flash",
+    "mixtral": "mixtral-8x7b-32768",
+    "llama3": "llama3-8b-8192",
+    "llama3-local": "llama3"
+}
+
+MAX_IDLE_PER_HOST = 4
+
+
+
+class ProviderError(Exception):
+    pass
+
+
+def resolve_endpoint(provider, config):
+    override = (config.get("provider_endpoints") or {}).get(provider)
+    if override:
+        return override
+    if provider == "openai":
+        return config.get("openai_api_base") or DEFAULT_ENDPOINTS["openai"]
+    return DEFAULT_ENDPOINTS.get(provider)
+
+
+def get_backend(provider, config):
+    backend = (config.get("provider_backends") or {}).get(provider)
+    if backend == "tgpt" or not resolve_endpoint(provider, config):
+        return "tgpt"
+    return "http"
+
+
+class ConnectionPool:
+    def __init__(self, max_idle=MAX_IDLE_PER_HOST):
+        self.max_idle = max_idle
+        self._idle = {}  # (scheme, host, port) -> [connection]
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+
+    def acquire(self, key, timeout):
+        with self._lock:
+            idle = self._idle.get(key)
+            conn = idle.pop() if idle else None
+
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+
+        scheme, host, port = key
+        if scheme == "https":
+            conn = http.client.HTTPSConnection(host, port, timeout=timeout, context=self._ssl_context)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=timeout)
+        conn.connect()
+        return conn, False
+
+    def release(self, key, conn):
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def close_all(self):
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+class ProviderClient:
+    def __init__(self):
+        self.pool = ConnectionPool()
+
+    def chat_completion(self, endpoint, model, messages, api_key=None, stream=False,
+                        timeout=30, on_chunk=None, on_connect=None, is_aborted=None):
+        parts = urlsplit(endpoint)
+        key = (parts.scheme, parts.hostname, parts.port or (443 if parts.scheme == "https" else 80))
+        # Accept the API base or the full endpoint; openai_api_base has always
+        # held the full URL because that is what tgpt's --url expects
+        path = parts.path.rstrip("/")
+        if not path.endswith("/chat/completions"):
+            path += "/chat/completions"
+        body = json.dumps({
+            "model": MODEL_ALIASES.get(model, model),
+            "messages": messages,
+            "stream": stream
+        }).encode("utf-8")
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "text/event-stream" if stream else "application/json"
+        }
+        if api_key and api_key != "enabled":
+            headers["Authorization"] = f"Bearer {api_key}"
+
+        for attempt in range(2):
+            conn, reused = self.pool.acquire(key, timeout)
+            if on_connect:
+                on_connect(conn)
+            try:
+                conn.request("POST", path, body=body, headers=headers)
+                response = conn.getresponse()
+                break
+            except OSError as e:
+                # A pooled connection the server has already dropped fails on
+                # first use; how depends on the platform (reset, broken pipe,
+                # ConnectionAbortedError or a bare OSError on Windows)
+                conn.close()
+                if not reused or attempt or isinstance(e, socket.timeout):
+                    raise
+            except Exception:
+                conn.close()
+                raise
+
+        try:
+            if response.status != 200:
+                raise ProviderError(f"HTTP {response.status}: {_error_message(response.read())}")
+            if stream:
+                text, complete = self._read_stream(response, on_chunk)
+            else:
+                text, complete = self._read_message(response), True
+        except Exception:
+            conn.close()
+            raise
+
+        # An aborted request had its socket shut down, which can look like a
+        # clean EOF; such a connection must never go back to the pool
+        if response.will_close or not complete or (is_aborted and is_aborted()):
+            conn.close()
+        else:
+            self.pool.release(key, conn)
+        return text
+
+    def _read_stream(self, response, on_chunk):
+        parts = []
+        while True:
+            line = response.readline()
+            if not line:
+                return "".join(parts), False  # ended without [DONE]
+            line = line.strip()
+            if not line.startswith(b"data:"):
+                continue
+            data = line[5:].strip()
+            if data == b"[DONE]":
+                break
+            event = json.loads(data)
+            choices = event.get("choices") or [{}]
+            delta = (choices[0].get("delta") or {}).get("content")
+            if delta:
+                parts.append(delta)
+                if on_chunk:
+                    on_chunk(delta)
+        response.read()  # drain the terminating chunk so the connection can be reused
+        return "".join(parts), True
+
+    def _read_message(self, response):
+        data = json.loads(response.read())
+        choices = data.get("choices") or []
+        if not choices:
+            raise ProviderError(f"Empty response: {data}")
+        return choices[0].get("message", {}).get("content") or ""
+
+
+def _error_message(body):
+    text = body.decode("utf-8", errors="replace")
+    try:
+        error = json.loads(text).get("error")
+        if isinstance(error, dict):
+            return error.get("message", text)
+        if error:
+            return str(error)
+    except (ValueError, AttributeError):
+        pass
+    return text.strip()[:500]
+
+
+_client = None
+
+
+def get_provider_client():
+    global _client
+    if _client is None:
+        _client = ProviderClient()
+    return _client
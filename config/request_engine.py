@@ -0,0 +1,346 @@
+# config/request_engine.py
+import codecs
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import uuid
+
+from PyQt5.QtCore import QObject, QRunnable, QThreadPool, QTimer, pyqtSignal
+
+from config.provider_client import get_provider_client
+from config.response_cache import get_response_cache
+
+MAX_CONCURRENT_REQUESTS = 4
+
+
+def _kill_process_tree(process):
+    if process.poll() is not None:
+        return
+    try:
+        if sys.platform.startswith("win"):
+            # shell=True puts tgpt under cmd.exe, so take the whole tree down
+            subprocess.run(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                           capture_output=True, timeout=5)
+        else:
+            os.killpg(process.pid, signal.SIGKILL)
+    except Exception:
+        try:
+            process.kill()
+        except Exception:
+            pass
+
+
+class _Watchdog(threading.Thread):
+    def __init__(self, timeout, on_expire):
+        super().__init__(daemon=True)
+        self.timeout = timeout
+        self.on_expire = on_expire
+        self.deadline = time.monotonic() + timeout
+        self._stopped = threading.Event()
+
+    def feed(self):
+        self.deadline = time.monotonic() + self.timeout
+
+    def stop(self):
+        self._stopped.set()
+
+    def run(self):
+        while not self._stopped.wait(max(self.deadline - time.monotonic(), 0)):
+            if time.monotonic() >= self.deadline:
+                self.on_expire()
+                return
+
+
+class LLMRequest(QObject):
+    chunk_received = pyqtSignal(str)
+    finished = pyqtSignal(str)
+    failed = pyqtSignal(str)
+    timed_out = pyqtSignal()
+    cancelled = pyqtSignal()
+
+    def __init__(self, cmd, timeout=30, stream=False):
+        super().__init__()
+        self.request_id = str(uuid.uuid4())
+        self.cmd = cmd
+        self.timeout = timeout
+        self.stream = stream
+        # perf_counter timestamps read by the latency trace
+        self.submitted_at = time.perf_counter()
+        self.spawned_at = None       # process started / connection made
+        self.first_chunk_at = None
+        self.last_chunk_at = None
+        self.source = "call"  # "cache" or "shared" when the engine answers without a call of its own
+        self._process = None
+        self._lock = threading.Lock()
+        self._cancelled = False
+        self._timed_out = False
+        self._detached = False   # caller stopped listening but others share the call
+        self._leader = None      # request whose call this one shares
+        self._followers = []
+
+    def is_cancelled(self):
+        return self._cancelled or self._detached
+
+    def cancel(self):
+        with self._lock:
+            if self.is_cancelled():
+                return
+            if self._leader is not None or any(not f.is_cancelled() for f in self._followers):
+                self._detached = True
+            else:
+                self._cancelled = True
+        if self._detached:
+            self.cancelled.emit()
+            leader = self._leader
+            if leader is not None and leader._detached and all(f.is_cancelled() for f in leader._followers):
+                # Nobody is waiting on the shared call any more
+                leader._cancelled = True
+                leader._abort()
+        else:
+            self._abort()
+
+    def _relay(self, signal_, *args):
+        if not self.is_cancelled():
+            signal_.emit(*args)
+
+    def _on_timeout(self):
+        with self._lock:
+            self._timed_out = True
+        self._abort()
+
+    def _abort(self):
+        process = self._process
+        if process is not None:
+            _kill_process_tree(process)
+
+    def _mark_chunk(self):
+        self.last_chunk_at = time.perf_counter()
+        if self.first_chunk_at is None:
+            self.first_chunk_at = self.last_chunk_at
+
+    def run(self):
+        popen_kwargs = {}
+        if not sys.platform.startswith("win"):
+            popen_kwargs["start_new_session"] = True
+
+        with self._lock:
+            if self._cancelled:
+                self.cancelled.emit()
+                return
+            try:
+                self._process = subprocess.Popen(
+                    self.cmd,
+                    shell=True,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.PIPE,
+                    bufsize=0,
+                    **popen_kwargs
+                )
+                self.spawned_at = time.perf_counter()
+            except Exception as e:
+                self.failed.emit(f"[Exception]: {e}")
+                return
+
+        stderr_chunks = []
+        stderr_reader = threading.Thread(
+            target=lambda: stderr_chunks.append(self._process.stderr.read()), daemon=True
+        )
+        stderr_reader.start()
+
+        # When streaming, the timeout applies to silence between chunks rather
+        # than to the whole answer
+        watchdog = _Watchdog(self.timeout, self._on_timeout)
+        watchdog.start()
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        output = []
+        try:
+            while True:
+                data = self._process.stdout.read(4096)
+                if not data:
+                    break
+                text = decoder.decode(data).replace("\r", "")
+                if not text:
+                    continue
+                self._mark_chunk()
+                output.append(text)
+                if self.stream:
+                    watchdog.feed()
+                    self.chunk_received.emit(text)
+            output.append(decoder.decode(b"", final=True))
+            self._process.wait()
+            stderr_reader.join(timeout=1)
+        except Exception as e:
+            self.failed.emit(f"[Exception]: {e}")
+            return
+        finally:
+            watchdog.stop()
+
+        stderr = b"".join(stderr_chunks).decode("utf-8", errors="replace")
+        if self._cancelled:
+            self.cancelled.emit()
+        elif self._timed_out:
+            self.timed_out.emit()
+        elif self._process.returncode == 0:
+            self.finished.emit("".join(output).strip())
+        else:
+            self.failed.emit(f"[Error]: {stderr}")
+
+
+class ProviderRequest(LLMRequest):
+    # Same signals as LLMRequest, served by the in-process HTTP client
+    # instead of a tgpt subprocess
+    def __init__(self, endpoint, model, messages, api_key=None, timeout=30, stream=False):
+        super().__init__(None, timeout, stream)
+        self.endpoint = endpoint
+        self.model = model
+        self.messages = messages
+        self.api_key = api_key
+        self._connection = None
+
+    def _abort(self):
+        # Shutting the socket down unblocks the worker's pending read
+        conn = self._connection
+        if conn is not None and conn.sock is not None:
+            try:
+                conn.sock.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def _set_connection(self, conn):
+        with self._lock:
+            self._connection = conn
+            self.spawned_at = time.perf_counter()
+            aborted = self._cancelled
+        if aborted:
+            self._abort()
+
+    def _on_chunk(self, text):
+        self._mark_chunk()
+        if self.stream:
+            self.chunk_received.emit(text)
+
+    def run(self):
+        if self._cancelled:
+            self.cancelled.emit()
+            return
+        try:
+            text = get_provider_client().chat_completion(
+                self.endpoint, self.model, self.messages,
+                api_key=self.api_key,
+                stream=self.stream,
+                timeout=self.timeout,
+                on_chunk=self._on_chunk,
+                on_connect=self._set_connection,
+                is_aborted=lambda: self._cancelled or self._timed_out
+            )
+        except socket.timeout:
+            if self._cancelled:
+                self.cancelled.emit()
+            else:
+                self.timed_out.emit()
+            return
+        except Exception as e:
+            if self._cancelled:
+                self.cancelled.emit()
+            else:
+                self.failed.emit(f"[Error]: {e}")
+            return
+        finally:
+            self._connection = None
+
+        if self._cancelled:
+            self.cancelled.emit()
+        else:
+            self._mark_chunk()
+            self.finished.emit(text.strip())
+
+
+class _RequestRunnable(QRunnable):
+    def __init__(self, request):
+        super().__init__()
+        self.request = request
+
+    def run(self):
+        self.request.run()
+
+
+class RequestEngine(QObject):
+    def __init__(self, max_workers=MAX_CONCURRENT_REQUESTS):
+        super().__init__()
+        self.pool = QThreadPool()
+        self.pool.setMaxThreadCount(max_workers)
+        self.requests = {}
+        self.in_flight = {}  # cache key -> request currently making that call
+
+    def submit(self, request, cache_key=None):
+        self.requests[request.request_id] = request
+        for signal_ in (request.finished, request.failed, request.timed_out, request.cancelled):
+            signal_.connect(lambda *_, rid=request.request_id: self.requests.pop(rid, None))
+
+        if cache_key is not None:
+            cache = get_response_cache()
+            cached = cache.get(cache_key)
+            stats = cache.stats()
+            if cached is not None:
+                print(f"[Cache] Hit ({stats['hits']} hits / {stats['misses']} misses)")
+                request.source = "cache"
+                QTimer.singleShot(0, lambda: request._relay(request.finished, cached))
+                return request
+
+            leader = self.in_flight.get(cache_key)
+            if leader is not None and not leader._cancelled:
+                print("[Cache] Sharing in-flight request", leader.request_id)
+                request.source = "shared"
+                self._follow(leader, request)
+                return request
+
+            print(f"[Cache] Miss ({stats['hits']} hits / {stats['misses']} misses)")
+            self.in_flight[cache_key] = request
+            request.finished.connect(lambda text, key=cache_key: cache.put(key, text))
+            request.finished.connect(lambda text, key=cache_key, r=request: self._land(key, r, "finished", text))
+            request.failed.connect(lambda error, key=cache_key, r=request: self._land(key, r, "failed", error))
+            request.timed_out.connect(lambda key=cache_key, r=request: self._land(key, r, "timed_out"))
+            request.cancelled.connect(lambda key=cache_key, r=request: self._land(key, r, "cancelled"))
+
+        self.pool.start(_RequestRunnable(request))
+        return request
+
+    def _follow(self, leader, follower):
+        # Followers don't stream; _land hands them the answer once the shared call ends
+        follower._leader = leader
+        leader._followers.append(follower)
+
+    def _land(self, cache_key, request, outcome, *args):
+        # Runs on the GUI thread, like submit(), so a follower either joined
+        # before this point and is answered here, or finds no leader and
+        # makes its own call
+        if outcome == "cancelled" and request._detached and not request._cancelled:
+            return  # the early cancelled emitted on detach; the call is still running
+        if self.in_flight.get(cache_key) is request:
+            del self.in_flight[cache_key]
+        if outcome != "cancelled":
+            for follower in request._followers:
+                follower._relay(getattr(follower, outcome), *args)
+
+    def cancel(self, request_id):
+        request = self.requests.get(request_id)
+        if request:
+            request.cancel()
+
+    def cancel_all(self):
+        for request in list(self.requests.values()):
+            request.cancel()
+
+
+_engine = None
+
+
+def get_request_engine():
+    global _engine
+    if _engine is None:
+        _engine = RequestEngine()
+    return _engine
@@ -0,0 +1,160 @@
+# config/response_cache.py
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+RESPONSE_CACHE_PATH = os.path.join("config", "response_cache.db")
+MEMORY_ENTRIES = 128
+DEFAULT_TTL_SECONDS = 24 * 60 * 60
+MAX_DISK_BYTES = 20 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL,
+    size INTEGER NOT NULL
+)
+"""
+
+
+def _normalize(context):
+    if isinstance(context, str):
+        return " ".join(context.split())
+    if isinstance(context, dict):
+        return {k: _normalize(v) for k, v in context.items()}
+    if isinstance(context, (list, tuple)):
+        return [_normalize(item) for item in context]
+    return context
+
+
+def make_cache_key(provider, model, context):
+    # Whitespace differences (trailing newlines, double spaces from voice
+    # transcripts) shouldn't turn an identical prompt into a miss
+    payload = json.dumps([provider, model, _normalize(context)], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    def __init__(self, path=RESPONSE_CACHE_PATH, memory_entries=MEMORY_ENTRIES,
+                 ttl=DEFAULT_TTL_SECONDS, max_disk_bytes=MAX_DISK_BYTES):
+        self.path = path
+        self.memory_entries = memory_entries
+        self.ttl = ttl
+        self.max_disk_bytes = max_disk_bytes
+        self._memory = OrderedDict()  # key -> (created, response), oldest first
+        self._lock = threading.Lock()
+        self._conn = None
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+            self._memory.pop(key, None)
+
+            row = None
+            conn = self._connection()
+            if conn is not None:
+                row = conn.execute(
+                    "SELECT response, created FROM responses WHERE key = ? AND created > ?",
+                    (key, now - self.ttl)
+                ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            with conn:
+                conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._remember(key, row[1], row[0])
+            self.disk_hits += 1
+            return row[0]
+
+    def put(self, key, response):
+        if not response:
+            return
+        now = time.time()
+        with self._lock:
+            self._remember(key, now, response)
+            conn = self._connection()
+            if conn is None:
+                return
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, response, created, accessed, size) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, response, now, now, len(response.encode("utf-8")))
+                )
+                self._evict(conn, now)
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            conn = self._connection()
+            if conn is not None:
+                with conn:
+                    conn.execute("DELETE FROM responses")
+
+    def stats(self):
+        with self._lock:
+            hits = self.memory_hits + self.disk_hits
+            total = hits + self.misses
+            return {
+                "hits": hits,
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": hits / total if total else 0.0,
+                "memory_entries": len(self._memory)
+            }
+
+    def _remember(self, key, created, response):
+        self._memory[key] = (created, response)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict(self, conn, now):
+        conn.execute("DELETE FROM responses WHERE created <= ?", (now - self.ttl,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_disk_bytes:
+            return
+        # Drop least recently used entries until back under the cap
+        for key, size in conn.execute("SELECT key, size FROM responses ORDER BY accessed").fetchall():
+            conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+            if total <= self.max_disk_bytes:
+                break
+
+    def _connection(self):
+        if self._conn is None:
+            try:
+                os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+                self._conn = sqlite3.connect(self.path, check_same_thread=False)
+                self._conn.execute(SCHEMA)
+            except sqlite3.Error as e:
+                # Fall back to memory-only caching
+                print("[Cache] Disk cache unavailable:", e)
+                self._conn = False
+        return self._conn or None
+
+
+_cache = None
+
+
+def get_response_cache():
+    global _cache
+    if _cache is None:
+        _cache = ResponseCache()
+    return _cache
@@ -0,0 +1,40 @@
+# config/startup_timer.py
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    # Times are relative to when this module was first imported, which
+    # main.py does before anything else
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.entries = []  # (name, start_ms, duration_ms or None for milestones)
+        self.reported = False
+
+    def elapsed_ms(self):
+        return (time.perf_counter() - self.origin) * 1000
+
+    @contextmanager
+    def stage(self, name):
+        start = self.elapsed_ms()
+        try:
+            yield
+        finally:
+            self.entries.append((name, start, self.elapsed_ms() - start))
+
+    def mark(self, name):
+        self.entries.append((name, self.elapsed_ms(), None))
+
+    def report(self):
+        if self.reported:
+            return
+        self.reported = True
+        print(f"[Startup] Timeline ({self.elapsed_ms():.0f} ms total):")
+        for name, start, duration in self.entries:
+            if duration is None:
+                print(f"[Startup]   {start:7.0f} ms  * {name}")
+            else:
+                print(f"[Startup]   {start:7.0f} ms  {name}: {duration:.0f} ms")
+
+
+startup_timer = StartupTimer()
@@ -0,0 +1,70 @@
+# config/tts_cache.py
+import hashlib
+import os
+import tempfile
+
+from edge_tts import Communicate
+
+TTS_CACHE_DIR = os.path.join("config", "tts_cache")
+MAX_CACHE_BYTES = 100 * 1024 * 1024
+
+
+def cache_key(text, voice):
+    return hashlib.sha256(f"{voice}\n{text}".encode("utf-8")).hexdigest()
+
+
+def cached_speech_path(text, voice):
+    return os.path.join(TTS_CACHE_DIR, cache_key(text, voice) + ".mp3")
+
+
+# Path of an mp3 of text spoken by voice, synthesized on a miss
+async def get_speech_file(text, voice):
+    path = cached_speech_path(text, voice)
+    if os.path.exists(path):
+        try:
+            os.utime(path)  # mtime doubles as last-used time for eviction
+        except OSError:
+            pass
+        return path
+
+    # Concurrent misses for the same key each write their own temp file;
+    # os.replace makes whichever finishes last win without a torn file
+    os.makedirs(TTS_CACHE_DIR, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(suffix=".part", dir=TTS_CACHE_DIR)
+    os.close(fd)
+    try:
+        await Communicate(text, voice=voice).save(tmp_path)
+        try:
+            os.replace(tmp_path, path)
+        except PermissionError:
+            # Windows won't replace a file that is playing; the copy there is just as good
+            if not os.path.exists(path):
+                raise
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    evict()
+    return path
+
+
+def evict(max_bytes=MAX_CACHE_BYTES):
+    try:
+        entries = []
+        for name in os.listdir(TTS_CACHE_DIR):
+            if not name.endswith(".mp3"):
+                continue
+            stat = os.stat(os.path.join(TTS_CACHE_DIR, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+    except OSError:
+        return
+
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(os.path.join(TTS_CACHE_DIR, name))
+            total -= size
+        except OSError:
+            pass
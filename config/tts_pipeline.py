@@ -0,0 +1,159 @@
+# config/tts_pipeline.py
+import asyncio
+import re
+import threading
+import time
+
+from playsound3 import playsound
+
+from config.metrics import get_metrics
+from config.tts_cache import get_speech_file
+
+LOOKAHEAD_SENTENCES = 3      # segments synthesized ahead of the one playing
+MIN_SEGMENT_CHARS = 40       # short sentences are merged so edge-tts isn't called per "Yes."
+MAX_SEGMENT_CHARS = 400
+PLAYBACK_POLL_SECONDS = 0.02
+
+SENTENCE_RE = re.compile(r"[^.!?\n]+(?:[.!?]+[\"')\]]*|\n+|$)")
+
+
+def split_sentences(text):
+    segments = []
+    current = ""
+    for match in SENTENCE_RE.finditer(text):
+        sentence = " ".join(match.group().split())
+        if not sentence:
+            continue
+        # Break overlong sentences at a comma or space so the first one stays quick
+        while len(sentence) > MAX_SEGMENT_CHARS:
+            cut = sentence.rfind(", ", 0, MAX_SEGMENT_CHARS)
+            if cut == -1:
+                cut = sentence.rfind(" ", 0, MAX_SEGMENT_CHARS)
+            if cut == -1:
+                cut = MAX_SEGMENT_CHARS
+            segments.append((current + " " + sentence[:cut + 1]).strip())
+            current = ""
+            sentence = sentence[cut + 1:].strip()
+        current = (current + " " + sentence).strip()
+        # The first segment goes out alone so audio starts as soon as possible
+        if len(current) >= MIN_SEGMENT_CHARS or not segments:
+            segments.append(current)
+            current = ""
+    if current:
+        segments.append(current)
+    return segments
+
+
+_loop = None
+_loop_lock = threading.Lock()
+
+
+def _synthesis_loop():
+    # One background event loop runs all edge-tts synthesis
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+            threading.Thread(target=_loop.run_forever, name="TTSSynthesis", daemon=True).start()
+        return _loop
+
+
+class SpeechPlayback(threading.Thread):
+    def __init__(self, text, voice, lookahead=LOOKAHEAD_SENTENCES):
+        super().__init__(name="SpeechPlayback", daemon=True)
+        self.text = text
+        self.voice = voice
+        self.lookahead = lookahead
+        self._stopped = threading.Event()
+        self._futures = []
+        self._sound = None
+
+    def stop(self):
+        self._stopped.set()
+        for future in self._futures:
+            future.cancel()
+        sound = self._sound
+        if sound is not None:
+            try:
+                sound.stop()
+            except Exception:
+                pass
+
+    def is_stopped(self):
+        return self._stopped.is_set()
+
+    def run(self):
+        segments = split_sentences(self.text)
+        loop = _synthesis_loop()
+        started = time.perf_counter()
+        trace = get_metrics().start_trace("tts", "edge-tts", self.voice, start=started,
+                                          segments=len(segments), chars=len(self.text))
+        synthesized_at = {}  # segment index -> when its audio file was ready
+        status = "stopped"
+
+        async def synthesize(i):
+            path = await get_speech_file(segments[i], self.voice)
+            # Set before the future resolves, so result() always sees it
+            synthesized_at[i] = time.perf_counter()
+            return path
+
+        def schedule(i):
+            if i < len(segments) and not self._stopped.is_set():
+                self._futures.append(asyncio.run_coroutine_threadsafe(synthesize(i), loop))
+
+        for i in range(min(self.lookahead, len(segments))):
+            schedule(i)
+
+        try:
+            for i in range(len(segments)):
+                if self._stopped.is_set():
+                    return
+                path = self._futures[i].result()
+                if self._stopped.is_set():
+                    return
+                if i == 0:
+                    trace.mark("first_synthesis", synthesized_at.get(0))
+                    trace.mark("playback_start")
+                    print(f"[TTS] First audio after {(time.perf_counter() - started) * 1000:.0f} ms "
+                          f"({len(segments)} segments)")
+                # Keep the window full while this segment plays
+                schedule(i + self.lookahead)
+
+                self._sound = playsound(path, block=False)
+                while self._sound.is_alive():
+                    if self._stopped.wait(PLAYBACK_POLL_SECONDS):
+                        return
+            status = "ok"
+        except Exception as e:
+            if not self._stopped.is_set():
+                print("[TTS Error]:", e)
+                status = "error"
+        finally:
+            self.stop()
+            if segments and len(synthesized_at) == len(segments):
+                trace.mark("synthesis_done", max(synthesized_at.values()))
+            trace.end(status)
+
+
+_current = None
+
+
+# Interrupts anything already playing
+def speak(text, voice):
+    global _current
+    stop_speaking()
+    _current = SpeechPlayback(text, voice)
+    _current.start()
+    return _current
+
+
+def stop_speaking():
+    if _current is not None:
+        _current.stop()
+
+
+def is_speaking(text=None):
+    playback = _current
+    if playback is None or playback.is_stopped() or not playback.is_alive():
+        return False
+    return text is None or playback.text == text
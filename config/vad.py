@@ -0,0 +1,109 @@
+# config/vad.py
+from collections import deque
+
+import numpy as np
+
+# Quiet after speech that ends dictation; long enough for a mid-sentence
+# pause. Overridable with the voice_endpoint_ms setting.
+DEFAULT_ENDPOINT_MS = 1500
+# Starting noise floor, in dBFS. A quieter room pulls it down within a few
+# frames; seeding from the first block would miss speech already under way.
+INITIAL_FLOOR_DB = -45.0
+
+
+# Frame-energy VAD with an adaptive noise floor. process() keeps speech plus
+# pre-roll and hangover; endpoint turns True after enough trailing silence.
+class EnergyVAD:
+    def __init__(self, sample_rate=16000, frame_ms=20, start_margin_db=9.0, stop_margin_db=5.0,
+                 start_ms=60, hangover_ms=300, preroll_ms=300, endpoint_ms=DEFAULT_ENDPOINT_MS,
+                 no_speech_timeout=8.0, floor_adapt=0.05, initial_floor_db=INITIAL_FLOOR_DB):
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_ms = frame_ms
+        self.start_margin_db = start_margin_db
+        self.stop_margin_db = stop_margin_db
+        self.start_frames = max(1, start_ms // frame_ms)
+        self.hangover_frames = hangover_ms // frame_ms
+        self.endpoint_frames = int(endpoint_ms) // frame_ms
+        self.no_speech_frames = int(no_speech_timeout * 1000) // frame_ms
+        self.floor_adapt = floor_adapt
+        self.initial_floor_db = initial_floor_db
+        self._preroll = deque(maxlen=max(1, preroll_ms // frame_ms))
+        self.reset()
+
+    def reset(self):
+        self.noise_floor_db = self.initial_floor_db
+        self.in_speech = False
+        self.heard_speech = False
+        self.endpoint = False
+        self._pending = b""
+        self._preroll.clear()
+        self._loud_run = 0
+        self._quiet_run = 0
+        self._frames_seen = 0
+
+    def frame_energies(self, samples):
+        # dBFS per frame, computed for the whole block at once
+        frames = samples[:len(samples) - len(samples) % self.frame_samples]
+        frames = frames.reshape(-1, self.frame_samples).astype(np.float32) / 32768.0
+        rms = np.sqrt(np.mean(frames * frames, axis=1))
+        return 20.0 * np.log10(rms + 1e-6)
+
+    def process(self, data):
+        data = self._pending + data
+        usable = len(data) - len(data) % (self.frame_samples * 2)
+        self._pending = data[usable:]
+        if not usable:
+            return b""
+
+        samples = np.frombuffer(data[:usable], dtype=np.int16)
+        energies = self.frame_energies(samples)
+
+        frame_bytes = self.frame_samples * 2
+        out = []
+        for i, energy in enumerate(energies.tolist()):
+            frame = data[i * frame_bytes:(i + 1) * frame_bytes]
+            self._frames_seen += 1
+            self._update(energy)
+
+            if self.in_speech:
+                out.append(frame)
+            elif self._loud_run >= self.start_frames:
+                # Onset: replay the pre-roll so the first syllable isn't clipped
+                self.in_speech = self.heard_speech = True
+                out.extend(self._preroll)
+                out.append(frame)
+                self._preroll.clear()
+            else:
+                self._preroll.append(frame)
+
+            if self.heard_speech and not self.in_speech and self._quiet_run >= self.endpoint_frames:
+                self.endpoint = True
+            elif not self.heard_speech and self._frames_seen >= self.no_speech_frames:
+                self.endpoint = True
+        return b"".join(out)
+
+    def _update(self, energy):
+        floor = self.noise_floor_db
+        if energy > floor + self.start_margin_db:
+            self._loud_run += 1
+        else:
+            self._loud_run = 0
+
+        if energy < floor + self.stop_margin_db:
+            self._quiet_run += 1
+        else:
+            self._quiet_run = 0
+
+        if self.in_speech and self._quiet_run >= self.hangover_frames:
+            self.in_speech = False
+            self._loud_run = 0
+
+        # Track the floor quickly downwards, slowly upwards, and barely at all
+        # while someone is talking
+        if energy < floor:
+            rate = 0.5
+        elif self.in_speech or self._loud_run:
+            rate = self.floor_adapt * 0.1
+        else:
+            rate = self.floor_adapt
+        self.noise_floor_db = floor + rate * (energy - floor)
@@ -0,0 +1,126 @@
+# config/voice_worker.py
+import json
+import queue
+import time
+
+import sounddevice as sd
+from vosk import KaldiRecognizer
+from PyQt5.QtCore import QThread, pyqtSignal
+
+from config.vad import DEFAULT_ENDPOINT_MS, EnergyVAD
+from config.vosk_model_registry import acquire_vosk_model, release_vosk_model
+
+SAMPLE_RATE = 16000
+BLOCK_SIZE = 1600  # 100 ms; the VAD needs short blocks to endpoint promptly
+QUEUE_POLL_SECONDS = 0.1
+
+
+class VoiceRecognitionWorker(QThread):
+    listening = pyqtSignal()
+    # Text so far, including the recognizer's current partial guess
+    partial_text = pyqtSignal(str)
+    final_text = pyqtSignal(str)
+    failed = pyqtSignal(str)
+
+    def __init__(self, parent=None, warm_pipeline=None, endpoint_ms=DEFAULT_ENDPOINT_MS):
+        super().__init__(parent)
+        self.warm_pipeline = warm_pipeline
+        self.endpoint_ms = endpoint_ms
+        self._stop_requested = False
+        # perf_counter timestamps read by the latency trace
+        self.listening_at = None
+        self.first_partial_at = None
+        self.speech_ended_at = None   # VAD endpoint or stop pressed
+        self.final_at = None
+
+    def stop(self):
+        # Finish early with whatever has been recognized so far
+        self._stop_requested = True
+
+    def run(self):
+        pipeline = self.warm_pipeline
+        if pipeline is not None and pipeline.is_running():
+            self._run_warm(pipeline)
+        else:
+            self._run_cold()
+
+    def _run_warm(self, pipeline):
+        # Stream already open and recognizers pre-built; the queue starts
+        # with the ring buffer's pre-roll
+        q = pipeline.subscribe()
+        rec = None
+        try:
+            rec = pipeline.take_recognizer()
+            self.final_text.emit(self._recognize(rec, q))
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            pipeline.unsubscribe(q)
+            if rec is not None:
+                pipeline.return_recognizer(rec)
+
+    def _run_cold(self):
+        try:
+            model = acquire_vosk_model()
+        except Exception as e:
+            self.failed.emit(str(e))
+            return
+
+        q = queue.Queue()
+
+        def callback(indata, frames, time_info, status):
+            if status:
+                print("[Audio Status]:", status)
+            q.put(bytes(indata))
+
+        try:
+            rec = KaldiRecognizer(model, SAMPLE_RATE)
+            with sd.RawInputStream(samplerate=SAMPLE_RATE, blocksize=BLOCK_SIZE, dtype='int16',
+                                   channels=1, callback=callback):
+                self.final_text.emit(self._recognize(rec, q))
+        except Exception as e:
+            self.failed.emit(str(e))
+        finally:
+            release_vosk_model()
+
+    def _recognize(self, rec, q):
+        vad = EnergyVAD(sample_rate=SAMPLE_RATE, endpoint_ms=self.endpoint_ms)
+        result_text = ""
+        shown = ""
+        print("[Voice] Listening for speech...")
+        self.listening_at = time.perf_counter()
+        self.listening.emit()
+        while not (self._stop_requested or vad.endpoint):
+            try:
+                data = q.get(timeout=QUEUE_POLL_SECONDS)
+            except queue.Empty:
+                continue
+
+            # Silence never reaches Kaldi; the VAD decides when dictation ends
+            speech = vad.process(data)
+            if not speech:
+                continue
+
+            text = shown
+            if rec.AcceptWaveform(speech):
+                result = json.loads(rec.Result())
+                if result.get("text"):
+                    result_text += result["text"] + " "
+                    text = result_text.strip()
+            else:
+                partial = json.loads(rec.PartialResult()).get("partial", "")
+                if partial.strip():
+                    text = f"{result_text.strip()} {partial}".strip()
+
+            if text != shown:
+                if self.first_partial_at is None:
+                    self.first_partial_at = time.perf_counter()
+                shown = text
+                self.partial_text.emit(text)
+
+        self.speech_ended_at = time.perf_counter()
+        final_result = json.loads(rec.FinalResult())
+        if final_result.get("text"):
+            result_text += final_result["text"]
+        self.final_at = time.perf_counter()
+        return result_text.strip()
@@ -0,0 +1,157 @@
+# config/vosk_model_registry.py
+import os
+import threading
+import time
+
+VOSK_MODEL_PATH = os.path.join("config", "models", "vosk-model-small-en-us-0.15")
+# A model nobody holds is freed after this long. Warm mode holds it for as
+# long as it is on, so only occasional dictation pays for a reload.
+IDLE_UNLOAD_SECONDS = 600
+
+
+def get_resident_memory_bytes():
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+
+    # Without psutil, only Linux can report this; elsewhere it reads 0
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return 0
+
+
+class VoskModelRegistry:
+    def __init__(self, idle_unload_seconds=IDLE_UNLOAD_SECONDS):
+        self.idle_unload_seconds = idle_unload_seconds
+        self._lock = threading.Lock()
+        self._models = {}
+        self._refcounts = {}
+        self._loading = {}
+        self._stats = {}
+        self._unload_timers = {}
+
+    def warm_up(self, model_path=VOSK_MODEL_PATH):
+        with self._lock:
+            if model_path in self._models or model_path in self._loading:
+                return
+        threading.Thread(target=self._warm_up, args=(model_path,), daemon=True).start()
+
+    def acquire(self, model_path=VOSK_MODEL_PATH):
+        while True:
+            model = self._get_or_load(model_path)
+            with self._lock:
+                # An idle unload may have run between loading and here
+                if self._models.get(model_path) is model:
+                    self._refcounts[model_path] = self._refcounts.get(model_path, 0) + 1
+                    self._cancel_unload(model_path)
+                    return model
+
+    def release(self, model_path=VOSK_MODEL_PATH):
+        with self._lock:
+            count = max(self._refcounts.get(model_path, 0) - 1, 0)
+            self._refcounts[model_path] = count
+            if count == 0:
+                self._schedule_unload(model_path)
+
+    def stats(self):
+        with self._lock:
+            return {
+                path: dict(stats, refcount=self._refcounts.get(path, 0), loaded=path in self._models)
+                for path, stats in self._stats.items()
+            }
+
+    def _schedule_unload(self, model_path):
+        # Called with the lock held
+        self._cancel_unload(model_path)
+        timer = threading.Timer(self.idle_unload_seconds, self._unload_if_idle, args=(model_path,))
+        timer.daemon = True
+        self._unload_timers[model_path] = timer
+        timer.start()
+
+    def _cancel_unload(self, model_path):
+        timer = self._unload_timers.pop(model_path, None)
+        if timer is not None:
+            timer.cancel()
+
+    def _unload_if_idle(self, model_path):
+        with self._lock:
+            self._unload_timers.pop(model_path, None)
+            if self._refcounts.get(model_path, 0) == 0 and self._models.pop(model_path, None) is not None:
+                print(f"[Voice] Vosk model unloaded after {self.idle_unload_seconds}s unused")
+
+    def _warm_up(self, model_path):
+        try:
+            self._get_or_load(model_path)
+        except Exception:
+            pass  # already reported; acquire() will retry
+
+    def _get_or_load(self, model_path):
+        with self._lock:
+            model = self._models.get(model_path)
+            if model is not None:
+                return model
+            event = self._loading.get(model_path)
+            owner = event is None
+            if owner:
+                event = threading.Event()
+                self._loading[model_path] = event
+
+        if not owner:
+            event.wait()
+            with self._lock:
+                model = self._models.get(model_path)
+            if model is None:
+                raise RuntimeError(f"Vosk model failed to load: {model_path}")
+            return model
+
+        try:
+            from vosk import Model
+
+            rss_before = get_resident_memory_bytes()
+            start = time.perf_counter()
+            model = Model(model_path=model_path)
+            load_seconds = time.perf_counter() - start
+            rss_delta = get_resident_memory_bytes() - rss_before
+
+            with self._lock:
+                self._models[model_path] = model
+                if not self._refcounts.get(model_path):
+                    self._schedule_unload(model_path)  # a warm-up nobody has used yet
+                self._stats[model_path] = {
+                    "load_seconds": load_seconds,
+                    "rss_delta_bytes": rss_delta,
+                    "rss_bytes": get_resident_memory_bytes(),
+                }
+            print(f"[Voice] Vosk model loaded in {load_seconds:.2f}s "
+                  f"(+{rss_delta / (1024 * 1024):.1f} MB resident)")
+            return model
+        except Exception as e:
+            print("[Voice] Failed to load Vosk model:", e)
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(model_path, None)
+            event.set()
+
+
+_registry = VoskModelRegistry()
+
+
+def warm_up_vosk_model(model_path=VOSK_MODEL_PATH):
+    _registry.warm_up(model_path)
+
+
+def acquire_vosk_model(model_path=VOSK_MODEL_PATH):
+    return _registry.acquire(model_path)
+
+
+def release_vosk_model(model_path=VOSK_MODEL_PATH):
+    _registry.release(model_path)
+
+
+def get_vosk_model_stats():
+    return _registry.stats()
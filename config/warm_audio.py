@@ -0,0 +1,126 @@
+# config/warm_audio.py
+import math
+import queue
+import threading
+from collections import deque
+
+import sounddevice as sd
+from vosk import KaldiRecognizer
+
+from config.vosk_model_registry import acquire_vosk_model, release_vosk_model
+
+SAMPLE_RATE = 16000
+BLOCK_SIZE = 1600
+PREROLL_SECONDS = 0.5
+RECOGNIZER_POOL_SIZE = 2
+
+
+# Keeps the mic open and recognizers built between dictations; the ring
+# buffer hands new listeners the half second before the hotkey press.
+class WarmAudioPipeline:
+    def __init__(self, sample_rate=SAMPLE_RATE, block_size=BLOCK_SIZE,
+                 preroll_seconds=PREROLL_SECONDS, pool_size=RECOGNIZER_POOL_SIZE):
+        self.sample_rate = sample_rate
+        self.block_size = block_size
+        self.pool_size = pool_size
+        self._ring = deque(maxlen=max(1, math.ceil(preroll_seconds * sample_rate / block_size)))
+        self._listeners = []
+        self._lock = threading.Lock()
+        self._stream = None
+        self._model = None
+        self._model_lock = threading.Lock()
+        self._pool = queue.Queue()
+        self._refilling = False  # at most one _fill_pool thread at a time
+
+    def start(self):
+        if self._stream is not None:
+            return
+        self._stream = sd.RawInputStream(samplerate=self.sample_rate, blocksize=self.block_size,
+                                         dtype='int16', channels=1, callback=self._callback)
+        self._stream.start()
+        self._start_refill()
+        print("[Voice] Warm mode: microphone stream open")
+
+    def stop(self):
+        stream, self._stream = self._stream, None
+        if stream is not None:
+            stream.stop()
+            stream.close()
+        with self._lock:
+            self._ring.clear()
+            self._listeners = []
+        with self._model_lock:
+            if self._model is not None:
+                self._model = None
+                release_vosk_model()
+
+    def is_running(self):
+        return self._stream is not None
+
+    def subscribe(self):
+        q = queue.Queue()
+        with self._lock:
+            for block in self._ring:
+                q.put(block)
+            self._listeners.append(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            if q in self._listeners:
+                self._listeners.remove(q)
+
+    def take_recognizer(self):
+        try:
+            rec = self._pool.get_nowait()
+        except queue.Empty:
+            rec = KaldiRecognizer(self._get_model(), self.sample_rate)
+        self._start_refill()
+        return rec
+
+    def return_recognizer(self, rec):
+        try:
+            rec.Reset()
+        except Exception as e:
+            print("[Voice] Dropping recognizer:", e)
+            return
+        with self._lock:
+            if self._pool.qsize() < self.pool_size:
+                self._pool.put(rec)
+
+    def _get_model(self):
+        with self._model_lock:
+            if self._model is None:
+                # Held for as long as warm mode is on
+                self._model = acquire_vosk_model()
+            return self._model
+
+    def _start_refill(self):
+        with self._lock:
+            if self._refilling:
+                return
+            self._refilling = True
+        threading.Thread(target=self._fill_pool, name="RecognizerPool", daemon=True).start()
+
+    def _fill_pool(self):
+        try:
+            while self._stream is not None and self._pool.qsize() < self.pool_size:
+                rec = KaldiRecognizer(self._get_model(), self.sample_rate)
+                with self._lock:
+                    if self._pool.qsize() >= self.pool_size:
+                        break  # a returned recognizer filled the last slot
+                    self._pool.put(rec)
+        except Exception as e:
+            print("[Voice] Could not prepare recognizer:", e)
+        finally:
+            with self._lock:
+                self._refilling = False
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            print("[Audio Status]:", status)
+        block = bytes(indata)
+        with self._lock:
+            self._ring.append(block)
+            for q in self._listeners:
+                q.put(block)
@@ -1,14 +1,21 @@
+from config.startup_timer import startup_timer
 import sys
 import threading
-import keyboard
-from PyQt5.QtWidgets import QApplication
-from PyQt5.QtCore import QObject, pyqtSignal, QTimer
-from tray import TrayApp
+import time
 import atexit
 
+with startup_timer.stage("import Qt"):
+    from PyQt5.QtWidgets import QApplication
+    from PyQt5.QtCore import QObject, pyqtSignal
+with startup_timer.stage("import keyboard"):
+    import keyboard
+with startup_timer.stage("import tray"):
+    from tray import TrayApp
+from config.config_store import get_config_store
+
 class HotkeyManager(QObject):
     open_chat_signal = pyqtSignal()
-    open_chat_voice_signal = pyqtSignal()
+    open_chat_voice_signal = pyqtSignal(float)
 
     def __init__(self, config, tray_ref):
         super().__init__()
@@ -18,17 +25,22 @@ class HotkeyManager(QObject):
 
         self.open_chat_signal.connect(self.tray_ref.toggle_chat_window)
 
-        def open_with_voice():
-            if not self.tray_ref.chat_windows:
+        def open_with_voice(pressed_at):
+            self.tray_ref.finish_startup()
+            if not self.tray_ref.chat_sessions:
                 return
-            chat_window = self.tray_ref.chat_windows[0]
+            chat_window = self.tray_ref.get_chat_window(self.tray_ref.chat_sessions[0])
             if not chat_window.isVisible():
                 self.tray_ref.toggle_chat_window()
-                QTimer.singleShot(300, chat_window.start_voice_recognition)
-            else:
-                chat_window.start_voice_recognition()
+            # Capture runs off the GUI thread, so it can start while the window animates in
+            chat_window.start_voice_recognition(pressed_at)
 
         self.open_chat_voice_signal.connect(open_with_voice)
+        get_config_store().config_changed.connect(self.on_config_changed)
+
+    def on_config_changed(self, keys):
+        if "shortcut_open_chat" in keys or "shortcut_open_chat_voice" in keys:
+            self.register()
 
 
     def register(self):
@@ -38,7 +50,7 @@ class HotkeyManager(QObject):
             voice_shortcut = self.config.get("shortcut_open_chat_voice", "ctrl+shift+l").lower()
 
             self.hotkeys.append(keyboard.add_hotkey(open_shortcut, lambda: self.open_chat_signal.emit()))
-            self.hotkeys.append(keyboard.add_hotkey(voice_shortcut, lambda: self.open_chat_voice_signal.emit()))
+            self.hotkeys.append(keyboard.add_hotkey(voice_shortcut, lambda: self.open_chat_voice_signal.emit(time.perf_counter())))
         except Exception as e:
             print("[Hotkey Registration Error]:", e)
 
@@ -51,18 +63,25 @@ class HotkeyManager(QObject):
         self.hotkeys = []
 
 def main():
-    app = QApplication(sys.argv)
-    app.setQuitOnLastWindowClosed(False)
+    with startup_timer.stage("QApplication"):
+        app = QApplication(sys.argv)
+        app.setQuitOnLastWindowClosed(False)
 
-    tray_icon_path = "assets/logo-colour.svg"
-    tray = TrayApp(tray_icon_path)
-    tray.show()
+    with startup_timer.stage("tray icon"):
+        tray_icon_path = "assets/logo-colour.svg"
+        tray = TrayApp(tray_icon_path)
+        tray.show()
 
     # Register hotkeys safely
-    tray.hotkey_manager = HotkeyManager(tray.config, tray)
-    tray.hotkey_manager.register()
+    with startup_timer.stage("hotkeys"):
+        tray.hotkey_manager = HotkeyManager(tray.config, tray)
+        tray.hotkey_manager.register()
+    startup_timer.mark("tray usable")
+
+    atexit.register(tray.flush_chats)
 
-    atexit.register(tray.save_all_chats)
+    # Saved chats, windows and the speech model load once the event loop runs
+    tray.start_deferred_stages()
 
     sys.exit(app.exec_())
 
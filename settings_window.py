@@ -5,7 +5,7 @@ from PyQt5.QtWidgets import (
 )
 from PyQt5.QtCore import Qt
 from PyQt5.QtGui import QPixmap
-from config.config_manager import load_config, save_config
+from config.config_store import get_config_store
 import os
 import sys
 import asyncio
@@ -13,19 +13,17 @@ import threading
 import subprocess
 import json
 import shutil
-from edge_tts import Communicate
-from playsound3 import playsound
-import ctypes
-import winreg
-from config.model_utils import get_provider_from_model
+from config.model_utils import get_available_models
+from config.ollama_catalog import get_ollama_catalog
 
 
 ENABLED_MODELS = []
 
 class SettingsWindow(QWidget):
-    def __init__(self, chat_window_ref, icon_path, config):
+    def __init__(self, tray_ref, icon_path, config):
         super().__init__()
-        self.chat_window_ref = chat_window_ref
+        self.tray_ref = tray_ref
+        self.config_store = get_config_store()
         self.config = config
 
         self.setWindowTitle("Lucid Settings")
@@ -33,8 +31,10 @@ class SettingsWindow(QWidget):
         self.setWindowFlags(Qt.WindowStaysOnTopHint | Qt.FramelessWindowHint)
         self.setObjectName("SettingsWindow")
 
-        self.ollama_installed = shutil.which("ollama") is not None
-        self.installed_ollama_models = self.get_installed_ollama_models() if self.ollama_installed else []
+        # Local models come from the shared catalog, cached on disk and
+        # refreshed in the background, so opening settings never shells out
+        self.ollama_catalog = get_ollama_catalog()
+        self.ollama_installed = self.ollama_catalog.is_installed()
         self.ollama_model_dropdown = None
         self.openai_url_field = None
 
@@ -120,6 +120,7 @@ class SettingsWindow(QWidget):
         self.model_tab = QWidget()
         self.tabs.addTab(self.general_tab, "General")
         self.tabs.addTab(self.model_tab, "Models")
+        self.tabs.currentChanged.connect(self.on_tab_changed)
         main_layout.addWidget(self.tabs)
 
         divider = QFrame()
@@ -158,23 +159,9 @@ class SettingsWindow(QWidget):
 
         general_layout.addWidget(QLabel("Default Model"))
         self.model_dropdown = QComboBox()
-        self.available_models = [
-            "gpt-3.5-turbo", "gpt-4o", "gemini-pro", "deepseek-chat",
-            "mixtral", "llama3", "phind", "isou", "pollinations"
-        ]
-        enabled_models = self.config.get("enabled_models", {})
-        if enabled_models.get("ollama", False) and self.ollama_installed:
-            self.available_models.append("llama3-local")
-
-        for model in self.available_models:
-            provider = get_provider_from_model(model)
-            if enabled_models.get(provider, False):
-                self.model_dropdown.addItem(model)
-
-        current_model = self.config.get("selected_model", "phind")
-        idx = self.model_dropdown.findText(current_model)
-        if idx != -1:
-            self.model_dropdown.setCurrentIndex(idx)
+        self.populate_model_dropdown(self.config.get("selected_model", "phind"))
+        self.ollama_catalog.models_changed.connect(self.on_ollama_models_changed)
+        self.config_store.value_changed.connect(self.on_config_value_changed)
         general_layout.addWidget(self.model_dropdown)
 
         general_layout.addWidget(QLabel("TTS Voice"))
@@ -343,15 +330,30 @@ class SettingsWindow(QWidget):
 
 
 
-    def get_installed_ollama_models(self):
-        try:
-            result = subprocess.run(["ollama", "list", "--json"], capture_output=True, text=True, timeout=5)
-            models = json.loads(result.stdout)
-            return [m.get("name") for m in models if "name" in m]
-        except Exception as e:
-            print("[Ollama Model Detection Error]:", e)
-            return []
-            
+    def populate_model_dropdown(self, current_model=None):
+        if current_model is None:
+            current_model = self.model_dropdown.currentText()
+        ollama_models = self.ollama_catalog.models if self.ollama_installed else []
+        enabled_models = dict(self.config.get("enabled_models", {}))
+        if not self.ollama_installed:
+            enabled_models["ollama"] = False
+        self.available_models = get_available_models({"enabled_models": enabled_models}, ollama_models)
+
+        self.model_dropdown.blockSignals(True)
+        self.model_dropdown.clear()
+        self.model_dropdown.addItems(self.available_models)
+        idx = self.model_dropdown.findText(current_model)
+        if idx != -1:
+            self.model_dropdown.setCurrentIndex(idx)
+        self.model_dropdown.blockSignals(False)
+
+    def on_ollama_models_changed(self, models):
+        self.populate_model_dropdown()
+
+    def on_tab_changed(self, index):
+        if self.tabs.widget(index) is self.model_tab:
+            self.ollama_catalog.refresh()
+
     # Add this method inside your SettingsWindow class
     def _divider(self):
         line = QFrame()
@@ -376,48 +378,56 @@ class SettingsWindow(QWidget):
             "Slow (20)": 20, "Medium (12)": 12, "Fast (6)": 6, "Instant (0)": 0
         }
 
-        if "enabled_models" not in self.config:
-            self.config["enabled_models"] = {}
-
+        # Build fresh dicts so the store can tell what changed
+        enabled_models = dict(self.config.get("enabled_models", {}))
+        api_keys = dict(self.config.get("api_keys", {}))
         for provider, field in self.fields.items():
             enabled = self.checkboxes[provider].isChecked()
-            self.config["enabled_models"][provider] = enabled
+            enabled_models[provider] = enabled
             if enabled:
-                self.config["api_keys"][provider] = field.text() if field else "enabled"
+                api_keys[provider] = field.text() if field else "enabled"
                 ENABLED_MODELS.append(provider)
             else:
-                self.config["api_keys"][provider] = ""
-
+                api_keys[provider] = ""
+
+        values = {
+            "enabled_models": enabled_models,
+            "api_keys": api_keys,
+            "shortcut_open_chat": self.shortcut_open_chat.keySequence().toString(),
+            "shortcut_open_chat_voice": self.shortcut_open_chat_voice.keySequence().toString(),
+            "run_on_startup": self.startup_checkbox.isChecked(),
+            "text_speed": speed_map.get(self.speed_dropdown.currentText(), 20),
+            "selected_model": self.model_dropdown.currentText(),
+            "tts_voice": self.voice_dropdown.currentText(),
+        }
         if self.openai_url_field:
-            self.config["openai_api_base"] = self.openai_url_field.text()
-        self.config["shortcut_open_chat"] = self.shortcut_open_chat.keySequence().toString()
-        self.config["shortcut_open_chat_voice"] = self.shortcut_open_chat_voice.keySequence().toString()
-
+            values["openai_api_base"] = self.openai_url_field.text()
         if self.ollama_model_dropdown:
-            self.config["selected_ollama_model"] = self.ollama_model_dropdown.currentText()
-
-        self.config["run_on_startup"] = self.startup_checkbox.isChecked()
-        self.config["text_speed"] = speed_map.get(self.speed_dropdown.currentText(), 20)
-        self.config["selected_model"] = self.model_dropdown.currentText()
-        self.config["tts_voice"] = self.voice_dropdown.currentText()
-        self.config["openai_api_base"] = self.openai_url_field.text()
+            values["selected_ollama_model"] = self.ollama_model_dropdown.currentText()
         self.set_startup(self.startup_checkbox.isChecked())
 
-        save_config(self.config)
-        self.chat_window_ref.apply_config(self.config)
+        # Open chat windows and the hotkey manager listen to the store
+        self.config_store.update(values)
         self.hide()
 
-        if hasattr(self.chat_window_ref.tray_ref, "hotkey_manager"):
-            self.chat_window_ref.tray_ref.hotkey_manager.config = self.config
-            self.chat_window_ref.tray_ref.hotkey_manager.register()
+    def on_config_value_changed(self, key, value):
+        if key == "enabled_models":
+            self.populate_model_dropdown()
+        elif key == "selected_model":
+            self.model_dropdown.blockSignals(True)
+            index = self.model_dropdown.findText(value)
+            if index != -1:
+                self.model_dropdown.setCurrentIndex(index)
+            self.model_dropdown.blockSignals(False)
 
 
     def preview_voice(self, voice_name):
         async def run():
             try:
-                communicate = Communicate("You are using Lucid AI; how can I assist you.", voice=voice_name)
-                await communicate.save("preview.mp3")
-                playsound("preview.mp3")
+                from config.tts_cache import get_speech_file
+                from playsound3 import playsound
+                path = await get_speech_file("You are using Lucid AI; how can I assist you.", voice_name)
+                playsound(path)
             except Exception as e:
                 print("[TTS Preview Error]:", e)
         threading.Thread(target=lambda: asyncio.run(run())).start()
@@ -425,6 +435,7 @@ class SettingsWindow(QWidget):
     def set_startup(self, enabled):
         key = r"Software\Microsoft\Windows\CurrentVersion\Run"
         try:
+            import winreg
             with winreg.OpenKey(winreg.HKEY_CURRENT_USER, key, 0, winreg.KEY_ALL_ACCESS) as reg_key:
                 if enabled:
                     exe_path = os.path.realpath(sys.argv[0])
@@ -440,6 +451,7 @@ class SettingsWindow(QWidget):
     def is_startup_enabled(self):
         key = r"Software\Microsoft\Windows\CurrentVersion\Run"
         try:
+            import winreg
             with winreg.OpenKey(winreg.HKEY_CURRENT_USER, key, 0, winreg.KEY_READ) as reg_key:
                 value, _ = winreg.QueryValueEx(reg_key, "Lucid")
                 return bool(value)
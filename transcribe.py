@@ -0,0 +1,164 @@
+# Batch offline transcription with the same Vosk model and VAD gating as
+# live dictation. A <name>.txt next to a recording is its reference transcript.
+#   python transcribe.py recordings/ -o results.jsonl --workers 4
+import argparse
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import time
+import wave
+
+from config.vosk_model_registry import VOSK_MODEL_PATH, acquire_vosk_model
+
+AUDIO_EXTENSIONS = (".wav", ".mp3")
+SAMPLE_RATE = 16000
+BLOCK_SIZE = 1600  # matches live capture
+
+_model = None
+_use_vad = True
+
+
+def find_audio_files(paths):
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.lower().endswith(AUDIO_EXTENSIONS))
+        elif path.lower().endswith(AUDIO_EXTENSIONS):
+            files.append(path)
+    return files
+
+
+# (sample_rate, 16-bit mono PCM bytes); anything but plain 16-bit mono WAV needs ffmpeg
+def read_pcm(path):
+    if path.lower().endswith(".wav"):
+        with wave.open(path, "rb") as wav:
+            if wav.getnchannels() == 1 and wav.getsampwidth() == 2 and wav.getcomptype() == "NONE":
+                return wav.getframerate(), wav.readframes(wav.getnframes())
+
+    result = subprocess.run(
+        ["ffmpeg", "-loglevel", "error", "-i", path, "-ar", str(SAMPLE_RATE), "-ac", "1", "-f", "s16le", "-"],
+        capture_output=True, check=True
+    )
+    return SAMPLE_RATE, result.stdout
+
+
+def word_error_rate(reference, hypothesis):
+    ref, hyp = reference.lower().split(), hypothesis.lower().split()
+    if not ref:
+        return 0.0 if not hyp else 1.0
+    previous = list(range(len(hyp) + 1))
+    for i, ref_word in enumerate(ref, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hyp, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1,
+                               previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1] / len(ref)
+
+
+def _init_worker(model_path, use_vad):
+    global _model, _use_vad
+    # Keep stdout clean for the JSONL stream
+    sys.stdout = sys.stderr
+    from vosk import SetLogLevel
+    SetLogLevel(-1)
+    _model = acquire_vosk_model(model_path)
+    _use_vad = use_vad
+
+
+def transcribe_file(path):
+    from vosk import KaldiRecognizer
+
+    record = {"file": path}
+    try:
+        sample_rate, pcm = read_pcm(path)
+        duration = len(pcm) / 2 / sample_rate
+
+        start = time.perf_counter()
+        rec = KaldiRecognizer(_model, sample_rate)
+        vad = None
+        if _use_vad:
+            from config.vad import EnergyVAD
+            # Files are transcribed to the end; only the silence gating applies,
+            # the endpoint flag is ignored
+            vad = EnergyVAD(sample_rate=sample_rate)
+
+        parts = []
+        block_bytes = BLOCK_SIZE * 2
+        for offset in range(0, len(pcm), block_bytes):
+            data = pcm[offset:offset + block_bytes]
+            if vad is not None:
+                data = vad.process(data)
+                if not data:
+                    continue
+            if rec.AcceptWaveform(data):
+                parts.append(json.loads(rec.Result()).get("text", ""))
+        parts.append(json.loads(rec.FinalResult()).get("text", ""))
+        decode_seconds = time.perf_counter() - start
+
+        text = " ".join(part for part in parts if part)
+        record.update({
+            "text": text,
+            "duration_seconds": round(duration, 3),
+            "decode_seconds": round(decode_seconds, 3),
+            "rtf": round(decode_seconds / duration, 4) if duration else None
+        })
+
+        reference_path = os.path.splitext(path)[0] + ".txt"
+        if os.path.exists(reference_path):
+            with open(reference_path, "r", encoding="utf-8") as f:
+                record["wer"] = round(word_error_rate(f.read(), text), 4)
+    except Exception as e:
+        record["error"] = str(e)
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Transcribe WAV/MP3 files offline with Vosk.")
+    parser.add_argument("paths", nargs="+", help="audio files or folders to scan")
+    parser.add_argument("-o", "--output", help="write JSONL here instead of stdout")
+    parser.add_argument("-w", "--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2),
+                        help="worker processes, each with its own model (default: half the CPUs)")
+    parser.add_argument("--model", default=VOSK_MODEL_PATH, help="Vosk model directory")
+    parser.add_argument("--no-vad", action="store_true", help="feed silence to the recognizer too")
+    args = parser.parse_args(argv)
+
+    files = find_audio_files(args.paths)
+    if not files:
+        print("No .wav or .mp3 files found.", file=sys.stderr)
+        return 1
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    total_audio = total_decode = 0.0
+    failures = 0
+    workers = max(1, min(args.workers, len(files)))
+    started = time.perf_counter()
+    try:
+        with multiprocessing.Pool(workers, initializer=_init_worker,
+                                  initargs=(args.model, not args.no_vad)) as pool:
+            for record in pool.imap_unordered(transcribe_file, files):
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+                if "error" in record:
+                    failures += 1
+                    print(f"[Transcribe] {record['file']}: {record['error']}", file=sys.stderr)
+                else:
+                    total_audio += record["duration_seconds"]
+                    total_decode += record["decode_seconds"]
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+    wall = time.perf_counter() - started
+    rtf = f"{total_decode / total_audio:.3f}" if total_audio else "n/a"
+    print(f"[Transcribe] {len(files) - failures}/{len(files)} files, {total_audio:.1f}s of audio "
+          f"in {wall:.1f}s wall ({workers} workers, mean RTF {rtf})", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,12 +1,15 @@
 from PyQt5.QtWidgets import QSystemTrayIcon, QWidget, QVBoxLayout, QPushButton, QApplication
-from PyQt5.QtCore import Qt, QPropertyAnimation, QPoint, QEventLoop
+from PyQt5.QtCore import Qt, QPropertyAnimation, QPoint, QEventLoop, QTimer
 from PyQt5.QtGui import QIcon, QCursor, QMouseEvent
-from chat_window import ChatWindow
-from settings_window import SettingsWindow
-from config.config_manager import load_config
-from chat_manager import ChatManagerWindow
-import uuid
-from config.chat_history_manager import save_chat_history, load_chat_history
+from config.config_store import get_config_store
+from config.chat_history_manager import load_chat_history
+from config.chat_persistence import get_persistence_writer
+from config.chat_search_index import get_search_index
+from config.chat_session import ChatSession
+from config.metrics import get_metrics
+from config.ollama_catalog import get_ollama_catalog
+from config.startup_timer import startup_timer
+from config.vosk_model_registry import warm_up_vosk_model
 
 
 class TrayApp(QSystemTrayIcon):
@@ -14,36 +17,136 @@ class TrayApp(QSystemTrayIcon):
         super().__init__(QIcon(icon_path), parent)
 
         chat_open = False
-        self.config = load_config()
-
-        self.chat_windows = []
-        self.chat_manager = ChatManagerWindow(self)
+        self.config_store = get_config_store()
+        self.config = self.config_store.config
+        self.config_store.value_changed.connect(self.on_config_value_changed)
+        self.warm_audio = None
+
+        self.chat_sessions = []
+        self.persistence_writer = get_persistence_writer()
+        self.persistence_writer.session_source = lambda: self.chat_sessions
         self.icon_path = icon_path  # Save for reuse
-
-
-        self.settings_window = SettingsWindow(self.chat_windows, icon_path, self.config)
+        self._chat_manager = None
+        self._settings_window = None
 
         self.setToolTip("Lucid")
         self.menu_popup = None
         self.activated.connect(self.tray_click)
-        try:
-            self.load_saved_chats()
-        except Exception as e:
-            print("[ERROR loading saved chats]:", e)
 
+        # Only the icon is set up here. The rest runs one stage per event-loop
+        # turn once the tray is showing, or all at once if the user gets there first
+        self._pending_stages = [
+            ("load saved chats", self.load_saved_chats),
+            ("chat manager", lambda: self.chat_manager),
+            ("import chat window", self._import_chat_window),
+            ("speech warm-up", self.warm_up_voice),
+            ("ollama models", self.refresh_ollama_models),
+            ("metrics", lambda: get_metrics().configure(self.config)),
+        ]
+
+    # --- Staged startup ---
+    def start_deferred_stages(self):
+        QTimer.singleShot(0, self._run_next_stage)
+
+    def _run_next_stage(self):
+        if not self._pending_stages:
+            return
+        self._run_stage(*self._pending_stages.pop(0))
+        if self._pending_stages:
+            QTimer.singleShot(0, self._run_next_stage)
+        else:
+            startup_timer.report()
+
+    def finish_startup(self):
+        if not self._pending_stages:
+            return
+        while self._pending_stages:
+            self._run_stage(*self._pending_stages.pop(0))
+        startup_timer.report()
+
+    def _run_stage(self, name, stage):
+        with startup_timer.stage(name):
+            try:
+                stage()
+            except Exception as e:
+                print(f"[Startup] {name} failed:", e)
+
+    def _import_chat_window(self):
+        # Pulls in the request engine, provider client and widgets so the
+        # first chat opens quickly
+        import chat_window  # noqa: F401
+
+    def warm_up_voice(self):
+        # Load the shared speech model in the background so the first
+        # dictation doesn't pay for it
+        warm_up_vosk_model()
+
+        # Optional: keep the microphone open with a pre-roll buffer so hotkey
+        # dictation starts capturing immediately
+        if self.config.get("voice_warm_mode", False) and self.warm_audio is None:
+            try:
+                from config.warm_audio import WarmAudioPipeline
+                self.warm_audio = WarmAudioPipeline()
+                self.warm_audio.start()
+            except Exception as e:
+                print("[Voice] Warm mode unavailable:", e)
+                self.warm_audio = None
+
+    def on_config_value_changed(self, key, value):
+        if key == "enabled_models":
+            self.refresh_ollama_models()
+        elif key == "voice_warm_mode" and not value and self.warm_audio is not None:
+            self.warm_audio.stop()
+            self.warm_audio = None
+        elif key == "voice_warm_mode" and value:
+            self.warm_up_voice()
+        elif key in ("metrics_enabled", "metrics_port"):
+            get_metrics().configure(self.config)
+
+    def refresh_ollama_models(self):
+        # Background fetch; dropdowns update when models_changed fires
+        if self.config.get("enabled_models", {}).get("ollama", False):
+            get_ollama_catalog().refresh()
+
+    @property
+    def chat_manager(self):
+        if self._chat_manager is None:
+            from chat_manager import ChatManagerWindow
+            self._chat_manager = ChatManagerWindow(self)
+        return self._chat_manager
+
+    @property
+    def settings_window(self):
+        # Built on first open; it probes ollama and the registry
+        if self._settings_window is None:
+            from settings_window import SettingsWindow
+            self._settings_window = SettingsWindow(self, self.icon_path, self.config)
+        return self._settings_window
 
     def tray_click(self, reason):
+        self.finish_startup()
         if reason == QSystemTrayIcon.Trigger:
             self.show_chat_manager()
         elif reason == QSystemTrayIcon.Context:
             self.show_popup_menu()
 
 
+    @property
+    def chat_windows(self):
+        return [session.window for session in self.chat_sessions if session.window is not None]
+
+    def get_chat_window(self, session):
+        if session.window is None:
+            from chat_window import ChatWindow
+            ChatWindow(self.icon_path, self.config, self, session)
+        return session.window
+
     def toggle_chat_window(self):
-        if not self.chat_windows:
+        self.finish_startup()
+        if not self.chat_sessions:
             return
 
-        chat_window = self.chat_windows[0]
+        chat_window = self.get_chat_window(self.chat_sessions[0])
         if chat_window.isVisible():
             self.animate_hide(chat_window)
         else:
@@ -141,14 +244,22 @@ class TrayApp(QSystemTrayIcon):
         self.menu_popup.show()
 
     def open_settings_window(self):
+        self.finish_startup()
+        self.refresh_ollama_models()
         self.settings_window.show()
         self.settings_window.activateWindow()
         self.settings_window.setFocus()
 
 
     def open_new_chat_window(self):
-        chat_window = ChatWindow(self.icon_path, self.config, self)
-        self.chat_windows.append(chat_window)
+        self.finish_startup()
+        session = ChatSession(
+            name=f"Chat {len(self.chat_sessions) + 1}",
+            model=self.config.get("selected_model", "phind")
+        )
+        self.chat_sessions.append(session)
+        get_search_index().add_session(session)
+        chat_window = self.get_chat_window(session)
 
         # Position to the right of the ChatManager if it's visible
         if self.chat_manager.isVisible():
@@ -166,49 +277,41 @@ class TrayApp(QSystemTrayIcon):
         chat_window.show()
         chat_window.activateWindow()
         chat_window.setFocus()
-        self.save_all_chats()
-        self.chat_manager.refresh()
+        session.mark_dirty()
+        self.chat_manager.chat_added(session)
 
     def show_chat_manager(self):
-        self.chat_manager.refresh()
+        self.finish_startup()
         self.chat_manager.show()
         self.chat_manager.activateWindow()
         self.chat_manager.setFocus()
 
     def save_all_chats(self):
-        chat_dicts = [chat.to_dict() for chat in self.chat_windows]
-        save_chat_history(chat_dicts)
+        # Queues every chat for the background writer; only unsaved
+        # messages are actually written
+        for session in self.chat_sessions:
+            self.persistence_writer.mark_dirty(session)
+
+    def flush_chats(self, timeout=2.0):
+        self.config_store.flush()
+        self.persistence_writer.stop(timeout)
 
 
 
     def load_saved_chats(self):
-        from config.chat_history_manager import load_chat_history
         print("[ChatManager] Loading saved chats...")
 
         saved_chats = load_chat_history()
         print(f"[ChatManager] {len(saved_chats)} saved chats found.")
 
+        # Windows are only built when a chat is actually opened
         for i, chat_data in enumerate(saved_chats):
             try:
-                chat = ChatWindow(self.icon_path, self.config, self)
-                chat.chat_id = chat_data.get("id", str(uuid.uuid4()))
-                chat.custom_name = chat_data.get("name", f"Chat {i+1}")
-                chat.model_name = chat_data.get("model", "phind")
-                chat.message_history = chat_data.get("history", [])
-
-                chat.setUpdatesEnabled(False)  # Prevent UI redraw while loading
-
-                try:
-                    for sender, message in chat.message_history[-10:]:  # only load recent messages
-                        chat.add_message(sender, message, selectable=True)
-                finally:
-                    chat.setUpdatesEnabled(True)
-
-
-                chat.hide()
-                self.chat_windows.append(chat)
-
+                session = ChatSession.from_dict(chat_data, i)
+                self.chat_sessions.append(session)
+                get_search_index().add_session(session)
             except Exception as e:
                 print(f"[ChatManager] Failed to load chat {i}: {e}")
 
-
+        if self._chat_manager is not None:
+            self._chat_manager.invalidate()
@@ -0,0 +1,105 @@
+from PyQt5.QtCore import Qt, QAbstractListModel, QModelIndex, QSize, QRect
+from PyQt5.QtWidgets import QStyledItemDelegate, QStyle
+from PyQt5.QtGui import QColor, QFont
+
+PREVIEW_ROLE = Qt.UserRole + 1
+SESSION_ROLE = Qt.UserRole + 2
+
+ROW_HEIGHT = 64
+ROW_PADDING = 10
+
+
+class ChatListModel(QAbstractListModel):
+    def __init__(self, preview_fn, parent=None):
+        super().__init__(parent)
+        self.preview_fn = preview_fn
+        self._rows = []      # [(session, snippet or None)]
+        self._row_of = {}    # chat_id -> row
+
+    def set_rows(self, rows):
+        self.beginResetModel()
+        self._rows = list(rows)
+        self._reindex()
+        self.endResetModel()
+
+    def append_session(self, session):
+        row = len(self._rows)
+        self.beginInsertRows(QModelIndex(), row, row)
+        self._rows.append((session, None))
+        self._row_of[session.chat_id] = row
+        self.endInsertRows()
+
+    def remove_session(self, chat_id):
+        row = self._row_of.get(chat_id)
+        if row is None:
+            return
+        self.beginRemoveRows(QModelIndex(), row, row)
+        del self._rows[row]
+        self._reindex()
+        self.endRemoveRows()
+
+    def chat_changed(self, chat_id):
+        row = self._row_of.get(chat_id)
+        if row is not None:
+            index = self.index(row)
+            self.dataChanged.emit(index, index)
+
+    def session_at(self, index):
+        if index.isValid() and 0 <= index.row() < len(self._rows):
+            return self._rows[index.row()][0]
+        return None
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid() or not (0 <= index.row() < len(self._rows)):
+            return None
+        session, snippet = self._rows[index.row()]
+        if role == Qt.DisplayRole:
+            return f"{session.custom_name or 'Chat'} ({session.model_name or 'Unknown'})"
+        if role == PREVIEW_ROLE:
+            return snippet or self.preview_fn(session)
+        if role == SESSION_ROLE:
+            return session
+        return None
+
+    def _reindex(self):
+        self._row_of = {session.chat_id: row for row, (session, _) in enumerate(self._rows)}
+
+
+class ChatListDelegate(QStyledItemDelegate):
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.title_color = QColor("#aaccff")
+        self.preview_color = QColor("#6688cc")
+        self.selected_color = QColor("#334455")
+
+    def paint(self, painter, option, index):
+        painter.save()
+        if option.state & QStyle.State_Selected:
+            painter.fillRect(option.rect, self.selected_color)
+
+        rect = option.rect.adjusted(ROW_PADDING, ROW_PADDING // 2, -ROW_PADDING, -ROW_PADDING // 2)
+
+        title_font = QFont(option.font)
+        title_font.setBold(True)
+        painter.setFont(title_font)
+        painter.setPen(self.title_color)
+        title_height = painter.fontMetrics().height()
+        title = painter.fontMetrics().elidedText(index.data(Qt.DisplayRole), Qt.ElideRight, rect.width())
+        painter.drawText(QRect(rect.left(), rect.top(), rect.width(), title_height),
+                         Qt.AlignLeft | Qt.AlignVCenter, title)
+
+        preview_font = QFont(option.font)
+        preview_font.setPointSize(10)
+        painter.setFont(preview_font)
+        painter.setPen(self.preview_color)
+        preview_rect = QRect(rect.left(), rect.top() + title_height + 2,
+                             rect.width(), rect.height() - title_height - 2)
+        painter.drawText(preview_rect, Qt.AlignLeft | Qt.AlignTop | Qt.TextWordWrap,
+                         index.data(PREVIEW_ROLE) or "")
+        painter.restore()
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ROW_HEIGHT)
@@ -0,0 +1,95 @@
+from PyQt5.QtWidgets import QTextEdit, QFrame, QSizePolicy
+from PyQt5.QtCore import Qt, QTimer, QElapsedTimer, pyqtSignal
+from PyQt5.QtGui import QTextCursor, QTextCharFormat, QFont
+
+FRAME_INTERVAL_MS = 16  # one chunk per ~60 Hz frame
+
+
+class TypingTextView(QTextEdit):
+    typing_finished = pyqtSignal()
+
+    def __init__(self, prefix="", parent=None):
+        super().__init__(parent)
+        self.prefix = prefix
+        self.setReadOnly(True)
+        self.setTextInteractionFlags(Qt.TextSelectableByMouse)
+        self.setFrameShape(QFrame.NoFrame)
+        self.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Fixed)
+        self.document().setDocumentMargin(2)
+        self.document().documentLayout().documentSizeChanged.connect(self._fit_height)
+
+        self._plain_format = QTextCharFormat()
+        self._prefix_format = QTextCharFormat()
+        self._prefix_format.setFontWeight(QFont.Bold)
+
+        self._pending = ""
+        self._pending_pos = 0
+        self._ms_per_char = 0
+        self._clock = QElapsedTimer()
+        self._timer = QTimer(self)
+        self._timer.setInterval(FRAME_INTERVAL_MS)
+        self._timer.timeout.connect(self._on_frame)
+
+        self.set_text("")
+
+    def set_text(self, text):
+        self._stop_typing()
+        self.clear()
+        cursor = self.textCursor()
+        if self.prefix:
+            cursor.insertText(f"{self.prefix} ", self._prefix_format)
+        cursor.insertText(text, self._plain_format)
+
+    def append_text(self, text):
+        if not text:
+            return
+        cursor = QTextCursor(self.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(text, self._plain_format)
+
+    def type_text(self, text, ms_per_char):
+        if ms_per_char <= 0:
+            self.append_text(text)
+            self.typing_finished.emit()
+            return
+
+        # Work out how many characters are due from elapsed time rather than
+        # counting ticks, so the configured speed holds even if frames slip
+        self._pending = self._pending[self._pending_pos:] + text
+        self._pending_pos = 0
+        self._ms_per_char = ms_per_char
+        self._clock.start()
+        self._timer.start()
+
+    def is_typing(self):
+        return self._timer.isActive()
+
+    def finish_typing(self):
+        if self._timer.isActive():
+            self.append_text(self._pending[self._pending_pos:])
+            self._stop_typing()
+            self.typing_finished.emit()
+
+    def _stop_typing(self):
+        self._timer.stop()
+        self._pending = ""
+        self._pending_pos = 0
+
+    def _on_frame(self):
+        due = min(int(self._clock.elapsed() / self._ms_per_char), len(self._pending))
+        if due > self._pending_pos:
+            self.append_text(self._pending[self._pending_pos:due])
+            self._pending_pos = due
+        if self._pending_pos >= len(self._pending):
+            self._stop_typing()
+            self.typing_finished.emit()
+
+    def _fit_height(self, size):
+        margins = self.contentsMargins()
+        self.setFixedHeight(int(size.height()) + 2 * self.frameWidth() + margins.top() + margins.bottom())
+
+    def wheelEvent(self, event):
+        # Let the surrounding chat scroll area handle scrolling
+        event.ignore()